@@ -4,58 +4,80 @@ import csv
 input_file = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Items\\Compare.csv"
 output_file = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Items\\Comparison_Results.csv"
 
-# Open the input CSV file and read its contents
-try:
-    with open(input_file, 'r', encoding='utf-8-sig') as csvfile:  # Use utf-8-sig to handle BOM
-        reader = csv.DictReader(csvfile)
-        rows = [{key.strip(): value for key, value in row.items()} for row in reader]
-except UnicodeDecodeError:
-    # Retry with a fallback encoding
-    with open(input_file, 'r', encoding='latin1') as csvfile:
+# Column pairs (CW column, NetSuite column) that identify the same item
+MATCH_KEYS = [('Product', 'Nsproduct')]
+
+# Column pairs (CW column, NetSuite column) compared for each matched item
+COMPARE_COLUMNS = [('Product', 'Nsproduct'), ('Category', 'Nscategory'), ('Subcategory', 'Nssubcategory')]
+
+# Ignore case and surrounding whitespace when matching and comparing
+NORMALIZE_VALUES = False
+
+# Encodings tried in order; utf-8-sig handles a BOM
+ENCODINGS = ['utf-8-sig', 'latin1']
+
+def normalize(value):
+    if value is None:
+        return ''
+    return value.strip().casefold() if NORMALIZE_VALUES else value
+
+def read_rows(encoding):
+    # Stream the input rows with the header names stripped
+    with open(input_file, 'r', encoding=encoding, newline='') as csvfile:
         reader = csv.DictReader(csvfile)
-        rows = [{key.strip(): value for key, value in row.items()} for row in reader]
-
-# Prepare a list to store comparison results
-comparison_results = []
-
-# Process the rows if data exists
-if rows:
-    for first_row in rows:
-        # Retrieve values from columns Product, Subcategory, Category in the current row
-        value_product = first_row['Product']
-        value_subcategory = first_row['Subcategory']
-        value_category = first_row['Category']
-
-        # Find the matching value in Column Nsproduct
-        matching_row = next((row for row in rows if row['Nsproduct'] == value_product), None)
-
-        if matching_row:
-            # Retrieve corresponding values from columns Nscategory and Nssubcategory
-            value_nsproduct = matching_row['Nsproduct']
-            value_nscategory = matching_row['Nscategory']
-            value_nssubcategory = matching_row['Nssubcategory']
-
-            # Compare values and prepare the output
-            comparison_results.append({
-                'Product': value_product,
-                'Nsproduct': value_nsproduct,
-                'Product == Nsproduct': value_product == value_nsproduct,
-                'Category': value_category,
-                'Nscategory': value_nscategory,
-                'Category == Nscategory': value_category == value_nscategory,
-                'Subcategory': value_subcategory,
-                'Nssubcategory': value_nssubcategory,
-                'Subcategory == Nssubcategory': value_subcategory == value_nssubcategory,
-            })
-
-# Write the comparison results to the output CSV file
-if comparison_results:
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['Product', 'Nsproduct', 'Product == Nsproduct', 'Category', 'Nscategory', 'Category == Nscategory', 'Subcategory', 'Nssubcategory', 'Subcategory == Nssubcategory']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-        # Write header and data rows
-        writer.writeheader()
-        writer.writerows(comparison_results)
+        for row in reader:
+            yield {key.strip(): value for key, value in row.items()}
+
+def build_ns_index():
+    # Index the NetSuite columns by match key; the first row wins, as before
+    for encoding in ENCODINGS:
+        try:
+            ns_index = {}
+            for row in read_rows(encoding):
+                key = tuple(normalize(row[ns_column]) for _, ns_column in MATCH_KEYS)
+                if key not in ns_index:
+                    ns_index[key] = {ns_column: row[ns_column] for _, ns_column in COMPARE_COLUMNS}
+            return ns_index, encoding
+        except UnicodeDecodeError:
+            # Retry with a fallback encoding
+            continue
+    raise UnicodeDecodeError(ENCODINGS[-1], b'', 0, 1, f"Could not decode {input_file}")
+
+# First pass: build the NetSuite index once
+ns_index, encoding = build_ns_index()
+
+# Column headers: each compared pair followed by its equality flag
+fieldnames = []
+for column, ns_column in COMPARE_COLUMNS:
+    fieldnames += [column, ns_column, f'{column} == {ns_column}']
+
+# Count of mismatches per compared column
+mismatches = {column: 0 for column, _ in COMPARE_COLUMNS}
+matched_count = 0
+
+# Second pass: stream the rows, look each one up, and write its comparison
+with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    writer.writeheader()
+
+    for row in read_rows(encoding):
+        key = tuple(normalize(row[column]) for column, _ in MATCH_KEYS)
+        matching_row = ns_index.get(key)
+        if not matching_row:
+            continue
+
+        matched_count += 1
+        result = {}
+        for column, ns_column in COMPARE_COLUMNS:
+            is_equal = normalize(row[column]) == normalize(matching_row[ns_column])
+            if not is_equal:
+                mismatches[column] += 1
+            result[column] = row[column]
+            result[ns_column] = matching_row[ns_column]
+            result[f'{column} == {ns_column}'] = is_equal
+        writer.writerow(result)
 
+print(f"Compared {matched_count} matched items.")
+for column, count in mismatches.items():
+    print(f"  {column}: {count} mismatches")
 print(f"Comparison results have been written to {output_file}")
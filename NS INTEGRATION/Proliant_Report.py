@@ -1,84 +1,135 @@
-import pandas as pd
+import argparse
 import os
-from datetime import datetime, timedelta
+import pandas as pd
 
-# Load the CSV file
+# Default input file and pay period
 input_file = r'C:\Users\jmoore\Documents\Netsuite\Proliant_Time.csv'
-data = pd.read_csv(input_file)
-
-# Filter relevant columns
-data = data[['ID', 'FirstName', 'LastName', 'PayrollItem', 'Date', 'Hours']]
-data['Date'] = pd.to_datetime(data['Date'])
-
-# Define the date range
-date_start = datetime(2024, 12, 15)
-date_end = datetime(2024, 12, 28)
-date_range = [date_start + timedelta(days=i) for i in range((date_end - date_start).days + 1)]
-
-# Initialize the output dataframe
-output_columns = [
-    'ID', 'First Name', 'Last Name', 'Holiday Pay', 'Hourly Pay', 'Overtime Pay',
-    'Paid Time Off', 'Paid Time Off - Unscheduled', 'Salary Pay', 'Salary Projects', 'Total Hours'
-] + [date.strftime('%m/%d/%y') for date in date_range]
-output_data = pd.DataFrame(columns=output_columns)
-
-# Group data by ID, FirstName, LastName
-rows = []
-for (id, first_name, last_name), group in data.groupby(['ID', 'FirstName', 'LastName']):
-    # Initialize row data
-    row = {
-        'ID': id,
-        'First Name': first_name,
-        'Last Name': last_name,
-        'Holiday Pay': 0,
-        'Hourly Pay': 0,
-        'Overtime Pay': 0,
-        'Paid Time Off': 0,
-        'Paid Time Off - Unscheduled': 0,
-        'Salary Pay': 0,
-        'Salary Projects': 0,
-        'Total Hours': 0  # Initialize Total Hours
-    }
-    # Add columns for each date
-    for date in date_range:
-        row[date.strftime('%m/%d/%y')] = 0
-
-    # Aggregate data
-    for _, record in group.iterrows():
-        date_str = record['Date'].strftime('%m/%d/%y')
-        if date_str in row:
-            row[date_str] += record['Hours']
-
-        if record['PayrollItem'] == 'Holiday Pay':
-            row['Holiday Pay'] += record['Hours']
-        elif record['PayrollItem'] == 'Hourly Pay':
-            row['Hourly Pay'] += record['Hours']
-        elif record['PayrollItem'] == 'Overtime Hourly':
-            row['Overtime Pay'] += record['Hours']
-        elif record['PayrollItem'] == 'Paid Time Off':
-            row['Paid Time Off'] += record['Hours']
-        elif record['PayrollItem'] == 'Paid Time Off - Unscheduled':
-            row['Paid Time Off - Unscheduled'] += record['Hours']
-        elif record['PayrollItem'] == 'Salary Pay':
-            row['Salary Pay'] += record['Hours']
-        elif record['PayrollItem'] == 'Salary Projects':
-            row['Salary Projects'] += record['Hours']
-
-    # Calculate Total Hours
-    row['Total Hours'] = (
-        row['Holiday Pay'] + row['Hourly Pay'] + row['Overtime Pay'] +
-        row['Paid Time Off'] + row['Paid Time Off - Unscheduled'] +
-        row['Salary Pay'] + row['Salary Projects']
-    )
-
-    # Append row to the list
-    rows.append(row)
-
-# Convert rows to DataFrame
-output_data = pd.DataFrame(rows, columns=output_columns)
-
-# Save the output to a new CSV file
-output_file = os.path.join(os.path.dirname(input_file), 'Processed_Proliant_Time.csv')
-output_data.to_csv(output_file, index=False)
-
-print(f"Output file created at: {output_file}")
+default_period = ('2024-12-15', '2024-12-28')
+
+# PayrollItem values and the output column each one is summed into
+PAYROLL_COLUMNS = {
+    'Holiday Pay': 'Holiday Pay',
+    'Hourly Pay': 'Hourly Pay',
+    'Overtime Hourly': 'Overtime Pay',
+    'Paid Time Off': 'Paid Time Off',
+    'Paid Time Off - Unscheduled': 'Paid Time Off - Unscheduled',
+    'Salary Pay': 'Salary Pay',
+    'Salary Projects': 'Salary Projects'
+}
+
+# Employee columns of the output
+EMPLOYEE_COLUMNS = {'ID': 'ID', 'FirstName': 'First Name', 'LastName': 'Last Name'}
+
+
+def check_periods(periods):
+    """
+    Parse pay periods and check they can be reported side by side.
+
+    Args:
+        periods (list): (start, end) pairs of date strings.
+
+    Returns:
+        list: (start, end) Timestamp pairs sorted by start.
+
+    Raises:
+        ValueError: If a date does not parse, a period ends before it starts,
+            or two periods overlap or repeat.
+    """
+    parsed = []
+    for start, end in periods:
+        try:
+            parsed.append((pd.Timestamp(start), pd.Timestamp(end)))
+        except ValueError:
+            raise ValueError(f"invalid date in period {start} {end}")
+        if parsed[-1][1] < parsed[-1][0]:
+            raise ValueError(f"period {start} {end} ends before it starts")
+
+    parsed.sort()
+    for (start, end), (next_start, next_end) in zip(parsed, parsed[1:]):
+        if (next_start, next_end) == (start, end):
+            raise ValueError(f"period {start:%Y-%m-%d} {end:%Y-%m-%d} is given more than once")
+        if next_start <= end:
+            raise ValueError(f"periods {start:%Y-%m-%d} {end:%Y-%m-%d} and "
+                             f"{next_start:%Y-%m-%d} {next_end:%Y-%m-%d} overlap")
+    return parsed
+
+
+def process_pay_periods(data, periods):
+    """
+    Build the Proliant payroll report for one or more pay periods in one pass.
+
+    Each time record is assigned to the pay period containing its date, then
+    the payroll-item and per-day columns are built with pivot_table.
+
+    Args:
+        data (pandas.DataFrame): Time records with ID, FirstName, LastName, PayrollItem, Date and Hours.
+        periods (list): (start, end) pairs of pay period dates, both inclusive;
+            they must not overlap (see check_periods).
+
+    Returns:
+        dict: (start, end) Timestamps to the report DataFrame of that period, in date order.
+    """
+    data = data[['ID', 'FirstName', 'LastName', 'PayrollItem', 'Date', 'Hours']].copy()
+    data['Date'] = pd.to_datetime(data['Date']).dt.normalize()
+
+    periods = check_periods(periods)
+    intervals = pd.IntervalIndex.from_tuples([(start, end + pd.Timedelta(days=1)) for start, end in periods],
+                                             closed='left')
+    data['Period'] = pd.cut(data['Date'], intervals).cat.codes
+    data = data[data['Period'] >= 0].dropna(subset=['ID', 'FirstName', 'LastName'])
+
+    keys = ['Period', 'ID', 'FirstName', 'LastName']
+
+    # Hours per payroll item; unrecognised items are left out as before
+    payroll = data.assign(Item=data['PayrollItem'].map(PAYROLL_COLUMNS)).dropna(subset=['Item'])
+    payroll = payroll.pivot_table(index=keys, columns='Item', values='Hours', aggfunc='sum', fill_value=0)
+    payroll = payroll.reindex(columns=list(PAYROLL_COLUMNS.values()), fill_value=0)
+    payroll['Total Hours'] = payroll.sum(axis=1)
+
+    # Hours per day
+    daily = data.pivot_table(index=keys, columns='Date', values='Hours', aggfunc='sum', fill_value=0)
+
+    employees = data[keys].drop_duplicates().set_index(keys).sort_index()
+    report = employees.join(payroll).join(daily).fillna(0).reset_index()
+
+    reports = {}
+    for code, (start, end) in enumerate(periods):
+        days = list(pd.date_range(start, end, freq='D'))
+        period_report = report[report['Period'] == code].reindex(
+            columns=keys + list(payroll.columns) + days, fill_value=0)
+        period_report = period_report.drop(columns='Period').rename(
+            columns={**EMPLOYEE_COLUMNS, **{day: day.strftime('%m/%d/%y') for day in days}})
+        reports[(start, end)] = period_report.reset_index(drop=True)
+    return reports
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the Proliant payroll report per pay period")
+    parser.add_argument("--input", default=input_file, help="Proliant time CSV")
+    parser.add_argument("--period", nargs=2, action="append", metavar=("START", "END"),
+                        help="pay period start and end date, inclusive (repeatable)")
+    args = parser.parse_args()
+    try:
+        args.period = check_periods(args.period or [default_period])
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    periods = args.period
+
+    # Load the CSV file
+    data = pd.read_csv(args.input)
+    reports = process_pay_periods(data, periods)
+
+    # Save each period to its own CSV file; a single period keeps the original file name
+    for (start, end), output_data in reports.items():
+        if len(reports) == 1:
+            file_name = 'Processed_Proliant_Time.csv'
+        else:
+            file_name = f"Processed_Proliant_Time_{start:%Y%m%d}_{end:%Y%m%d}.csv"
+        output_file = os.path.join(os.path.dirname(args.input), file_name)
+        output_data.to_csv(output_file, index=False)
+        print(f"Output file created at: {output_file}")
@@ -1,57 +1,34 @@
 import os
+import sys
 import pandas as pd
 import requests
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables from environment file
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE
-}
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_client import BASE_URL
+from cw_paging import fetch_all_pages
 
 def get_companies():
     try:
-        all_companies = []  # Store all retrieved companies
-        page = 1  # Start with the first page
-
-        while True:
-            # Updated parameters, supporting pagination
-            params = {
-                "childConditions": "(types/id = 50 or types/id = 54 or types/id = 1 or types/id = 34 or types/id = 40 or types/id = 48 or types/id = 53 or types/id = 52 or types/id = 51 or types/id = 49)",
-                "conditions": "(deletedFlag = false)",
-                "fields": "id,name,status,taxCode",
-                "page": page  # Current page number
-            }
-
-            # Make the API request
-            response = requests.get(f"{BASE_URL}/company/companies", headers=headers, params=params)
-            response.raise_for_status()
-
-            # Parse the JSON response
-            response_data = response.json()
-
-            if not isinstance(response_data, list) or not response_data:
-                break  # Exit loop if no more data
-
-            # Normalize data and extract required fields
-            for company in response_data:
-                all_companies.append({
-                    "id": company.get("id", "Unknown"),
-                    "name": company.get("name", "Unknown"),
-                    "status_name": company.get("status", {}).get("name", "Unknown"),
-                    "tax_code_name": company.get("taxCode", {}).get("name", "Unknown"),
-                    "companyEntityType": company.get("companyEntityType", {}).get("name", "Unknown")
-                })
-
-            page += 1  # Move to the next page
+        params = {
+            "childConditions": "(types/id = 50 or types/id = 54 or types/id = 1 or types/id = 34 or types/id = 40 or types/id = 48 or types/id = 53 or types/id = 52 or types/id = 51 or types/id = 49)",
+            "conditions": "(deletedFlag = false)",
+            "fields": "id,name,status,taxCode"
+        }
+
+        # Fetch all pages concurrently
+        response_data = fetch_all_pages(f"{BASE_URL}/company/companies", params)
+
+        # Normalize data and extract required fields
+        all_companies = []
+        for company in response_data:
+            all_companies.append({
+                "id": company.get("id", "Unknown"),
+                "name": company.get("name", "Unknown"),
+                "status_name": company.get("status", {}).get("name", "Unknown"),
+                "tax_code_name": company.get("taxCode", {}).get("name", "Unknown"),
+                "companyEntityType": company.get("companyEntityType", {}).get("name", "Unknown")
+            })
 
         # Convert all data to a DataFrame
         results_df = pd.DataFrame(all_companies)
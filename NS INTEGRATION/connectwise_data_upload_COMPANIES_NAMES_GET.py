@@ -1,8 +1,13 @@
 import os
+import sys
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_fields import get_json
+
 # Load environment variables
 load_dotenv()
 
@@ -17,6 +22,10 @@ headers = {
     "Authorization": "Basic " + AUTH_CODE
 }
 
+# Keep-alive session for the sandbox
+session = requests.Session()
+session.headers.update(headers)
+
 def get_companies():
     try:
         # Parameters for the API request without any search conditions
@@ -87,12 +96,11 @@ def get_company_name_status_deletedflag_by_id(company_id):
     Retrieves the company name, status, and deletedFlag based on the given company ID using the ConnectWise GET API.
     """
     try:
-        # Make the GET request for the specific company ID
-        response = requests.get(url=f"{BASE_URL}/company/companies/{company_id}", headers=headers)
-        response.raise_for_status()  # Raise exception for HTTP errors
+        # Make the GET request for the specific company ID, projected to the fields read below
+        company_data = get_json(f"{BASE_URL}/company/companies/{company_id}",
+                                "companies_names_get.company_status", session=session)
 
-        # Parse the JSON response to extract company name, status, and deletedFlag
-        company_data = response.json()
+        # Extract company name, status, and deletedFlag
         company_name = company_data.get("name", "Unknown")
         company_status = company_data.get("status", {}).get("name", "Unknown")
         deleted_flag = company_data.get("deletedFlag", "Unknown")
@@ -1,28 +1,31 @@
 import os
+import sys
 import pandas as pd
-import requests
 import re
-from dotenv import load_dotenv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# Load environment variables
-load_dotenv()
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_client import BASE_URL, get_session
+from cw_journal import SUCCESS, RunJournal, journal_key, parse_run_args
+from cw_sink import ResultSink
 
-# Accessing API variables from environment file
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
+# Rows whose company -> contact -> default contact chain runs at the same time
+MAX_CONCURRENT_COMPANIES = int(os.getenv("CW_CONCURRENCY", "8"))
 
-# Set up headers for the API request
-headers = {
-    "clientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE,
-    "Content-Type": "application/json",
-    "Accept": "application/vnd.connectwise.v4+json"  # Specify API version here
-}
+# Shared keep-alive session; specify API version here
+session = get_session(accept="application/vnd.connectwise.v4+json")
 
 # Load the CSV file
 csv_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Company\CW_Company_111824.csv"
+output_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Company\CW_Company_Data_Results_111824.csv"
+
+# Journal of created companies; --resume skips the ones already created
+args = parse_run_args("Create companies and their default contacts from the NetSuite export.", f"{output_path}.journal")
+journal = RunJournal(args.journal, resume=args.resume, fresh=args.fresh)
+
 data = pd.read_csv(csv_path)
 
 # Extract the required columns
@@ -50,7 +53,7 @@ def get_location_id(territory_name):
         "fields": "id",
         "conditions": f"(name like \"{territory_name}%\")"
     }
-    response = requests.get(f"{BASE_URL}/system/locations", headers=headers, params=params)
+    response = session.get(f"{BASE_URL}/system/locations", params=params)
     
     if response.status_code == 200:
         locations = response.json()
@@ -73,7 +76,7 @@ def get_billing_terms_id(billing_terms_name):
         "fields": "id",
         "conditions": f"(name like \"{billing_terms_name}%\")"
     }
-    response = requests.get(f"{BASE_URL}/finance/billingTerms", headers=headers, params=params)
+    response = session.get(f"{BASE_URL}/finance/billingTerms", params=params)
     
     if response.status_code == 200:
         billing_terms = response.json()
@@ -92,7 +95,7 @@ def get_market_id(market_name):
         "fields": "id",
         "conditions": f"(name like \"{market_name}%\")"
     }
-    response = requests.get(f"{BASE_URL}/company/marketDescriptions", headers=headers, params=params)
+    response = session.get(f"{BASE_URL}/company/marketDescriptions", params=params)
     
     if response.status_code == 200:
         markets = response.json()
@@ -107,11 +110,9 @@ def clean_name(name):
     # Remove non-alphanumeric characters, then remove spaces, and trim to 26 characters
     return re.sub(r'[^A-Za-z0-9]+', '', name)[:26]
 
-# List to store API results
-results = []
-
-# Iterate over each row and allow blank IDs
-for _, row in filtered_data.iterrows():
+# Function to create one company, its contact, and set the default contact, in that order.
+# The company POST's status and new ID go into created as soon as they are known.
+def submit_company(row, created):
     original_name = row["name"]
     cleaned_name = clean_name(original_name)
 
@@ -178,7 +179,8 @@ for _, row in filtered_data.iterrows():
     payload = {k: v for k, v in payload.items() if v is not None}
     
     # Make the API request to create the company
-    response = requests.post(f"{BASE_URL}/company/companies", headers=headers, json=payload)
+    response = session.post(f"{BASE_URL}/company/companies", json=payload)
+    created["status_code"] = response.status_code
     
     # Track contact creation details for output
     contact_payload_details = None
@@ -186,6 +188,7 @@ for _, row in filtered_data.iterrows():
     if response.status_code == 201:
         print(f"Successfully added company: {original_name}")
         company_id = response.json().get("id")
+        created["company_id"] = company_id
         
         # Check conditions for creating a contact
         if company_id and (row["primary_contact"] or row["email"] or row["phone"]):
@@ -193,8 +196,8 @@ for _, row in filtered_data.iterrows():
             contact_first_name = "Accounts"
             contact_last_name = "Payable"
             if row["primary_contact"]:
-                contact_first_name = row["primary_contact"].split()[0]
-                contact_last_name = row["primary_contact"].split()[-1]
+                contact_first_name = str(row["primary_contact"]).split()[0]
+                contact_last_name = str(row["primary_contact"]).split()[-1]
 
             # Construct contact payload
             contact_payload = {
@@ -223,7 +226,7 @@ for _, row in filtered_data.iterrows():
             contact_payload_details = contact_payload
             
             # Make the API request to create the contact
-            contact_response = requests.post(f"{BASE_URL}/company/contacts", headers=headers, json=contact_payload)
+            contact_response = session.post(f"{BASE_URL}/company/contacts", json=contact_payload)
             if contact_response.status_code == 201:
                 print(f"Successfully added contact for company: {original_name}")
                 contact_id = contact_response.json().get("id")
@@ -239,7 +242,7 @@ for _, row in filtered_data.iterrows():
                             }
                         }
                     ]
-                    update_response = requests.patch(f"{BASE_URL}/company/companies/{company_id}", headers=headers, json=update_payload)
+                    update_response = session.patch(f"{BASE_URL}/company/companies/{company_id}", json=update_payload)
                     if update_response.status_code == 200:
                         print(f"Successfully set default contact for company: {original_name}")
                     else:
@@ -249,17 +252,60 @@ for _, row in filtered_data.iterrows():
     else:
         print(f"Failed to add company: {original_name}, Status Code: {response.status_code}, Payload: {payload}, Response: {response.text}")
 
-    # Log results, including contact payload details if contact was attempted
-    result = {
+    # Result row, including contact payload details if contact was attempted
+    return {
         "name": original_name,
         "status_code": response.status_code,
         "response_text": response.text,
         "contact_payload": contact_payload_details  # Include contact payload details in the output
     }
-    results.append(result)
 
-# Convert results to a DataFrame and save to CSV
-results_df = pd.DataFrame(results)
-output_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Company\CW_Company_Data_Results_111824.csv"
-results_df.to_csv(output_path, index=False)
+# Function to run one row and journal its outcome; an error fails only this row, never the run
+def create_company(row, row_key):
+    created = {}
+    try:
+        result = submit_company(row, created)
+    except Exception as e:
+        print(f"Error adding company: {row['name']}, Error: {e}")
+        result = {
+            "name": row["name"],
+            "status_code": created.get("status_code"),
+            "response_text": f"Error: {e}",
+            "contact_payload": None
+        }
+
+    # Record the outcome; once the company exists the row is done, even if the contact failed
+    success = created.get("status_code") == 201
+    journal.record(row_key, SUCCESS if success else "failed",
+                   created_id=created.get("company_id") if success else None, status_code=created.get("status_code"))
+    return result
+
+# Resolve the lookups once per distinct value before the rows run concurrently
+for territory in filtered_data["territory"].drop_duplicates():
+    get_location_id(territory)
+for billing_terms in filtered_data["billing_terms"].drop_duplicates():
+    get_billing_terms_id(billing_terms)
+for market in filtered_data["market"].drop_duplicates():
+    get_market_id(market)
+
+# Run the rows concurrently with a bounded window, streaming results to the output file in input order
+with ResultSink(output_path, fieldnames=["name", "status_code", "response_text", "contact_payload"],
+                flush_every=1, append=args.resume) as sink, \
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENT_COMPANIES) as executor:
+    pending = deque()
+    for row in filtered_data.to_dict("records"):
+        # Rows are keyed by NetSuite ID, or by name when the ID is blank
+        row_key = journal_key(row["ID"]) if not pd.isna(row["ID"]) else journal_key("name", row["name"])
+        if journal.is_done(row_key):
+            print(f"Skipping company: {row['name']}, already created as ID {journal.created_id(row_key)}")
+            continue
+
+        pending.append(executor.submit(create_company, row, row_key))
+        if len(pending) >= MAX_CONCURRENT_COMPANIES * 2:
+            sink.write(pending.popleft().result())
+
+    while pending:
+        sink.write(pending.popleft().result())
+
+journal.close()
 print(f"Results saved to {output_path}")
@@ -1,53 +1,30 @@
 import os
+import sys
 import pandas as pd
 import requests
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables from environment file
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE
-}
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_client import BASE_URL
+from cw_paging import fetch_all_pages
 
 def get_glAccounts():
     try:
-        all_glAccounts = []  # Store all retrieved glAccounts
-        page = 1  # Start with the first page
-
-        while True:
-            # Updated parameters, supporting pagination
-            params = {
-                "conditions": "(glType = 'EI')",
-                "page": page  # Current page number
-            }
-
-            # Make the API request
-            response = requests.get(f"{BASE_URL}/finance/glAccounts", headers=headers, params=params)
-            response.raise_for_status()
-
-            # Parse the JSON response
-            response_data = response.json()
-
-            if not isinstance(response_data, list) or not response_data:
-                break  # Exit loop if no more data
-
-            # Normalize data and extract required fields
-            for glAccounts in response_data:
-                all_glAccounts.append({
-                    "id": glAccounts.get("id", "Unknown"),
-                    "glType": glAccounts.get("glType", "Unknown"),
-                    "mappedRecord": glAccounts.get("mappedRecord", {}).get("name", "Unknown")
-                })
-
-            page += 1  # Move to the next page
+        params = {
+            "conditions": "(glType = 'EI')"
+        }
+
+        # Fetch all pages concurrently
+        response_data = fetch_all_pages(f"{BASE_URL}/finance/glAccounts", params)
+
+        # Normalize data and extract required fields
+        all_glAccounts = []
+        for glAccounts in response_data:
+            all_glAccounts.append({
+                "id": glAccounts.get("id", "Unknown"),
+                "glType": glAccounts.get("glType", "Unknown"),
+                "mappedRecord": glAccounts.get("mappedRecord", {}).get("name", "Unknown")
+            })
 
         # Convert all data to a DataFrame
         results_df = pd.DataFrame(all_glAccounts)
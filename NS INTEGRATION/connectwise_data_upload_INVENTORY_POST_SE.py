@@ -1,28 +1,21 @@
 import os
+import sys
 import pandas as pd
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API requests
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json",
-    "Accept": "application/vnd.connectwise.com+json; version=2021.1"
-}
+
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_adjustments import submit_adjustment
+from cw_catalog import resolve_catalog_items
+from cw_client import get_session
+
+# Shared keep-alive session with the API version pinned
+session = get_session(accept="application/vnd.connectwise.com+json; version=2021.1")
 
 # Load the CSV file paths
 input_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Inventory\\NSInventoryAddSE.csv"
 skipped_items_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Inventory\\NSInventoryAddSE_skipped_items.csv"
 combined_output_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Inventory\\NSInventoryAddSE_combined_output.csv"
+failed_details_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Inventory\\NSInventoryAddSE_failed_details.csv"
 product_details_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Inventory\\NSInventoryAddSE_product_details.csv"
 
 # List of required columns
@@ -38,25 +31,19 @@ df = df[required_columns]
 # Replace NaN values with defaults
 df.fillna("", inplace=True)
 
+# Resolve every distinct ProdID once, in bulk, instead of once per serial-number row
+catalog_items = resolve_catalog_items(
+    (prod_id for prod_id in df['ProdID'] if prod_id),
+    fields="id,identifier,description,productClass",
+    session=session
+)
+
 # Define a function to perform the product lookup
 def product_lookup(prod_id):
-    try:
-        # API request for product lookup
-        endpoint = f"{BASE_URL}/procurement/catalog"
-        params = {
-            "conditions": f"identifier like \"{prod_id}%\"",
-            "fields": "id,identifier,description,productClass"
-        }
-        response = requests.get(endpoint, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data and len(data) > 0:
-            return data[0]['id'], data[0]['identifier'], data[0].get('productClass', 'Unknown')
-        else:
-            return None, None, None
-    except Exception as e:
-        print(f"Error looking up product {prod_id}: {e}")
-        return None, None, None
+    item = catalog_items.get(str(prod_id).strip())
+    if item:
+        return item['id'], item['identifier'], item.get('productClass', 'Unknown')
+    return None, None, None
 
 # Create the adjustment details payload
 adjustment_details = []
@@ -92,32 +79,31 @@ for index, row in df.iterrows():
         else:
             skipped_items.append({"ProdID": prod_id, "Reason": "Not identified as inventory item"})
 
-# Combine into a single POST payload
-payload = {
+# Adjustment header, created once before the detail lines are added
+header = {
     "identifier": "NetsuiteConvert010325SE",
     "type": {"id": 3},
-    "reason": "Netsuite Conversion",
-    "adjustmentDetails": adjustment_details
+    "reason": "Netsuite Conversion"
 }
 
-# Perform the POST request
-try:
-    endpoint = f"{BASE_URL}/procurement/adjustments"
-    response = requests.post(endpoint, headers=headers, json=payload)
-    if response.status_code == 400:
-        print("Error 400: Bad Request. Response details:", response.text)
-    elif response.status_code == 500:
-        print("Error 500: Internal Server Error. Response details:", response.text)
-    else:
-        response.raise_for_status()
-        print("POST request successful:", response.json())
-except requests.exceptions.RequestException as e:
-    print("Error in POST request:", e)
+# Create the adjustment, then add the detail lines concurrently with per-line retries
+adjustment_id, detail_results = submit_adjustment(header, adjustment_details, session=session) if adjustment_details else (None, [])
+if adjustment_details and adjustment_id is None:
+    # Without the header none of the lines were added, so all of them have to be resubmitted
+    detail_results = [{"status": "Failed", "status_code": None, "error": "Adjustment header was not created"}
+                      for _ in adjustment_details]
+failed_details = [
+    dict(result, Identifier=detail["catalogItem"]["identifier"], SerialNumber=detail.get("serialNumber", ""))
+    for detail, result in zip(adjustment_details, detail_results)
+    if result["status"] != "Success"
+]
 
 # Save combined results to a file
 result_summary = {
     "Total Records Processed": len(df),
+    "Adjustment ID": adjustment_id,
     "Adjustment Details Count": len(adjustment_details),
+    "Detail Lines Failed": len(failed_details),
     "Skipped Items Count": len(skipped_items)
 }
 summary_df = pd.DataFrame([result_summary])
@@ -129,6 +115,11 @@ if skipped_items:
     skipped_items_df.to_csv(skipped_items_file_path, index=False)
     print(f"Skipped items saved to {skipped_items_file_path}")
 
+# Save failed detail lines so they can be resubmitted
+if failed_details:
+    pd.DataFrame(failed_details).to_csv(failed_details_file_path, index=False)
+    print(f"Failed detail lines saved to {failed_details_file_path}")
+
 # Save product details to a separate file
 if product_details:
     product_details_df = pd.DataFrame(product_details)
@@ -136,3 +127,7 @@ if product_details:
     print(f"Product details saved to {product_details_file_path}")
 
 print(f"Processing completed. Summary saved to {combined_output_file_path}")
+
+if adjustment_details and adjustment_id is None:
+    print("Adjustment header creation failed; no detail lines were added.")
+    sys.exit(1)
@@ -1,28 +1,28 @@
 import os
+import sys
 import pandas as pd
 import requests
 import json
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_client import BASE_URL, get_session
+from cw_contacts import CompanyContactCache
+from cw_journal import SUCCESS, RunJournal, journal_key, parse_run_args
+from cw_members import MemberIndex
+from cw_sink import ResultSink
 
-# Load API credentials and base URL from environment variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API requests
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
+# Shared session; throttled responses are retried instead of losing the row
+session = get_session()
 
 # Load the CSV file containing contact data
 csv_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Opportunity\\Production\\Update_Opportunity_122824.csv"
 output_file_path = r"c:\\users\\jmoore\\documents\\connectwise\\integration\\NS_Integration\\Opportunity\\Production\\All_Opportunities_122824_Results.csv"
 
+# Journal of created opportunities; --resume skips the ones already created
+args = parse_run_args("Create opportunities from the NetSuite export.", f"{output_file_path}.journal")
+journal = RunJournal(args.journal, resume=args.resume, fresh=args.fresh)
+
 # Specify the columns to read from the CSV file
 columns_to_read = [
     'name', 'expectedCloseDate', 'stage', 'notes', 'type', 'probability', 'salesRep', 'salesEngineer', 'CW_Company',
@@ -64,177 +64,145 @@ def extract_last_name(sales_rep):
     else:
         return segments[-1]  # Fallback to the last segment
 
-# Function to get primarySalesRep ID from ConnectWise API
-def get_primary_sales_rep_id(last_name):
-    if not last_name:
-        return None
-    api_url = f"{BASE_URL}/system/members"
-    params = {
-        "conditions": f"lastName like \"{last_name}%\""
-    }
-    try:
-        response = requests.get(api_url, headers=headers, params=params)
-        if response.status_code == 200:
-            members = response.json()
-            if members:
-                return members[0]['id']
-            else:
-                print(f"No matching member found for last name: {last_name}")
-                return None
-        else:
-            print(f"Failed to fetch member data for last name {last_name}. Status Code: {response.status_code}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error occurred while fetching member data for last name {last_name}: {str(e)}")
-        return None
-
-# Function to get contact ID using the ConnectWise API
-def get_contact_id(company_id):
-    if not company_id:
-        return None
-    api_url = f"{BASE_URL}/company/contacts"
-    params = {
-        "conditions": f"(company/id = {company_id})"
-    }
-    try:
-        response = requests.get(api_url, headers=headers, params=params)
-        if response.status_code == 200:
-            contacts = response.json()
-            if contacts:
-                return contacts[0]['id']
-            else:
-                print(f"No contacts found for company ID: {company_id}")
-                return None
-        else:
-            print(f"Failed to fetch contacts for company ID {company_id}. Status Code: {response.status_code}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error occurred while fetching contacts for company ID {company_id}: {str(e)}")
-        return None
+# Member directory from one paged pull, used to resolve sales reps
+members = MemberIndex.load(session=session)
 
-# List to store results
-results = []
+# Default contact of every company in the file, prefetched in chunked queries
+contact_cache = CompanyContactCache(session=session)
+contact_cache.prefetch(contacts_df['CW_Company'])
 
 # Flag to track if the pause has occurred
 pause_completed = False
 
-# Iterate over each row in the DataFrame
-for index, row in contacts_df.iterrows():
-    if index == 10 and not pause_completed:
-        input_response = input("First 10 records processed. Do you want to continue with the rest? (yes/no): ")
-        if input_response.strip().lower() != "yes":
-            print("Process terminated by the user.")
-            break
-        pause_completed = True
-
-    # Format the dates
-    close_date = format_date(row['expectedCloseDate'])
-    invoice_by_date = format_date(row['InvoiceByDate'])
-    stage_id = row['stage']
-    type_id = row['type']
-
-    # Determine status based on stage value
-    if stage_id == 26:
-        status = 5
-    elif stage_id == 25:
-        status = 3
-    else:
-        status = 1
-
-    # Extract last name from salesRep
-    last_name = extract_last_name(row['salesRep'])
-
-    # Lookup primarySalesRep ID, fallback to 'Kilmon' if not found
-    primary_sales_rep_id = get_primary_sales_rep_id(last_name)
-    if not primary_sales_rep_id:
-        primary_sales_rep_id = get_primary_sales_rep_id("Kilmon")
-
-    if not row['CW_Company']:
-        print(f"Skipping record due to missing CW_Company for row {index}")
-        continue
-
-    contact_id = get_contact_id(row['CW_Company'])
-
-    # Handle probability
-    try:
-        probability_value = int(float(row['probability']))
-    except ValueError:
-        probability_value = None
-
-    probability = {"id": probability_value} if probability_value else None
-
-    lead_source = row['ForecastCategory'] if row['ForecastCategory'] else 'Other'
-
-    # Prepare the payload
-    payload = {
-        "name": row['name'],
-        "expectedCloseDate": close_date,
-        "type": {"id": type_id},
-        "stage": {"id": stage_id},
-        "status": {"id": status},
-        "source": lead_source,
-        "notes": row['notes'],
-        "probability": probability,
-        "company": {"id": row['CW_Company']},
-        "primarySalesRep": {"id": primary_sales_rep_id},
-        "secondarySalesRep": {"id": 358},
-        "locationId": 2,
-        "businessUnitId": 26,
-        "contact": {"id": contact_id},
-        "customFields": [
-            {"id": 25, "caption": "Quoted By", "value": row['QuotedBy'] or "2024-10-22T00:00:00Z"},
-            {"id": 8, "caption": "Sales Engineer", "value": row['salesEngineer']},
-            {"id": 20, "caption": "Forecast Category", "value": row['ForecastCategory']},
-            {"id": 18, "caption": "Forecast Notes", "value": row['ForecastNotes']},
-            {"id": 33, "caption": "Proj Total Contract Amt", "value": row['Amount']},
-            {"id": 45, "caption": "Opportunity Category", "value": 'New'},
-            {"id": 46, "caption": "Customer Type", "value": 'End User'},
-            {"id": 51, "caption": "BDE", "value": row['BDE']},
-            {"id": 61, "caption": "470 Number", "value": row['470#']},
-            {"id": 62, "caption": "471 Number", "value": row['471#']},
-            {"id": 71, "caption": "FRN Number", "value": row['frnNumber']},
-            {"id": 73, "caption": "Invoice By Date", "value": invoice_by_date},
-            {"id": 75, "caption": "NetsuiteID", "value": row['NetsuiteID']},
-            {"id": 67, "caption": "Billed Entity Number", "value": row['BEN']}
-        ]
-    }
-
-    payload = {key: value for key, value in payload.items() if value is not None}
-
-    api_url = f"{BASE_URL}/sales/opportunities"
-
-    try:
-        response = requests.post(api_url, headers=headers, data=json.dumps(payload))
-        if response.status_code == 201:
-            response_data = response.json()
-            opportunity_id = response_data.get('id')
-            print(f"Successfully created Opportunity ID: {opportunity_id}")
-            result = {
-                "OpportunityNumber": opportunity_id,
-                "Status": "Success",
-                "ErrorMessage": ""
-            }
+# Rows processed in this run, not counting the ones skipped from the journal
+processed = 0
+
+# Stream each result to the output file as soon as it is journaled; a resumed run appends to it
+with ResultSink(output_file_path, fieldnames=["OpportunityNumber", "Status", "ErrorMessage"],
+                flush_every=1, append=args.resume) as sink:
+    # Iterate over each row in the DataFrame
+    for index, row in contacts_df.iterrows():
+        # Rows are keyed by NetSuite ID, or by company and opportunity name when the ID is blank,
+        # so the keys survive the file being re-exported or re-sorted
+        if row['NetsuiteID'] != '':
+            row_key = journal_key(row['NetsuiteID'])
+        else:
+            row_key = journal_key("opportunity", row['CW_Company'], row['name'])
+        if journal.is_done(row_key):
+            print(f"Skipping row {index}: already created as Opportunity ID {journal.created_id(row_key)}")
+            continue
+
+        if processed == 10 and not pause_completed:
+            input_response = input("First 10 records processed. Do you want to continue with the rest? (yes/no): ")
+            if input_response.strip().lower() != "yes":
+                print("Process terminated by the user.")
+                break
+            pause_completed = True
+        processed += 1
+
+        # Format the dates
+        close_date = format_date(row['expectedCloseDate'])
+        invoice_by_date = format_date(row['InvoiceByDate'])
+        stage_id = row['stage']
+        type_id = row['type']
+
+        # Determine status based on stage value
+        if stage_id == 26:
+            status = 5
+        elif stage_id == 25:
+            status = 3
         else:
+            status = 1
+
+        # Extract last name from salesRep
+        last_name = extract_last_name(row['salesRep'])
+
+        # Lookup primarySalesRep ID by full name or last name, fallback to 'Kilmon' if not found
+        primary_sales_rep_id = members.resolve(row['salesRep'], last_name=last_name, fallback="Kilmon")
+
+        if not row['CW_Company']:
+            print(f"Skipping record due to missing CW_Company for row {index}")
+            continue
+
+        contact_id = contact_cache.contact_id(row['CW_Company'])
+
+        # Handle probability
+        try:
+            probability_value = int(float(row['probability']))
+        except ValueError:
+            probability_value = None
+
+        probability = {"id": probability_value} if probability_value else None
+
+        lead_source = row['ForecastCategory'] if row['ForecastCategory'] else 'Other'
+
+        # Prepare the payload
+        payload = {
+            "name": row['name'],
+            "expectedCloseDate": close_date,
+            "type": {"id": type_id},
+            "stage": {"id": stage_id},
+            "status": {"id": status},
+            "source": lead_source,
+            "notes": row['notes'],
+            "probability": probability,
+            "company": {"id": row['CW_Company']},
+            "primarySalesRep": {"id": primary_sales_rep_id},
+            "secondarySalesRep": {"id": 358},
+            "locationId": 2,
+            "businessUnitId": 26,
+            "contact": {"id": contact_id},
+            "customFields": [
+                {"id": 25, "caption": "Quoted By", "value": row['QuotedBy'] or "2024-10-22T00:00:00Z"},
+                {"id": 8, "caption": "Sales Engineer", "value": row['salesEngineer']},
+                {"id": 20, "caption": "Forecast Category", "value": row['ForecastCategory']},
+                {"id": 18, "caption": "Forecast Notes", "value": row['ForecastNotes']},
+                {"id": 33, "caption": "Proj Total Contract Amt", "value": row['Amount']},
+                {"id": 45, "caption": "Opportunity Category", "value": 'New'},
+                {"id": 46, "caption": "Customer Type", "value": 'End User'},
+                {"id": 51, "caption": "BDE", "value": row['BDE']},
+                {"id": 61, "caption": "470 Number", "value": row['470#']},
+                {"id": 62, "caption": "471 Number", "value": row['471#']},
+                {"id": 71, "caption": "FRN Number", "value": row['frnNumber']},
+                {"id": 73, "caption": "Invoice By Date", "value": invoice_by_date},
+                {"id": 75, "caption": "NetsuiteID", "value": row['NetsuiteID']},
+                {"id": 67, "caption": "Billed Entity Number", "value": row['BEN']}
+            ]
+        }
+
+        payload = {key: value for key, value in payload.items() if value is not None}
+
+        api_url = f"{BASE_URL}/sales/opportunities"
+
+        try:
+            response = session.post(api_url, data=json.dumps(payload))
+            if response.status_code == 201:
+                response_data = response.json()
+                opportunity_id = response_data.get('id')
+                print(f"Successfully created Opportunity ID: {opportunity_id}")
+                result = {
+                    "OpportunityNumber": opportunity_id,
+                    "Status": "Success",
+                    "ErrorMessage": ""
+                }
+            else:
+                result = {
+                    "OpportunityNumber": "N/A",
+                    "Status": f"Failed: {response.status_code}",
+                    "ErrorMessage": response.text
+                }
+        except requests.exceptions.RequestException as e:
             result = {
                 "OpportunityNumber": "N/A",
-                "Status": f"Failed: {response.status_code}",
-                "ErrorMessage": response.text
+                "Status": "Error",
+                "ErrorMessage": str(e)
             }
-    except requests.exceptions.RequestException as e:
-        result = {
-            "OpportunityNumber": "N/A",
-            "Status": "Error",
-            "ErrorMessage": str(e)
-        }
-
-    results.append(result)
 
-# Save results
-results_df = pd.DataFrame(results)
+        # Record the outcome before moving on so a crash can resume after this row
+        journal.record(row_key, SUCCESS if result["Status"] == "Success" else "failed",
+                       created_id=result["OpportunityNumber"] if result["Status"] == "Success" else None)
 
-if os.path.exists(output_file_path):
-    results_df.to_csv(output_file_path, mode='a', index=False, header=False)
-else:
-    results_df.to_csv(output_file_path, index=False)
+        sink.write(result)
 
+journal.close()
 print(f"Results have been saved to {output_file_path}")
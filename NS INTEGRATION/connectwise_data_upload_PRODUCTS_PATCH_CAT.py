@@ -4,7 +4,10 @@ import requests
 import json
 from dotenv import load_dotenv
 import sys
-from lookup_utils import lookup_subcategory
+
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_reference import ReferenceResolver
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +29,9 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# Reference tables are bulk-loaded once instead of queried per row
+resolver = ReferenceResolver(base_url=BASE_URL)
+
 # Load the CSV file paths
 input_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\Production\Activate_Items.csv"
 output_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\Production\Patch_Items_Update.csv"
@@ -62,7 +68,7 @@ def process_rows(start_index, end_index):
         subcategory_name = row["subCategory"]
 
         # Perform lookup for subcategory using category and subcategory names
-        subcategory_id = lookup_subcategory(category_name, subcategory_name, BASE_URL, headers)
+        subcategory_id = resolver.lookup_subcategory(category_name, subcategory_name)
 
         # Construct the PATCH payload
         patch_payload = []
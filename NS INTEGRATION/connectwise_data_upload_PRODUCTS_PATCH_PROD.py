@@ -4,7 +4,10 @@ import requests
 import json
 from dotenv import load_dotenv
 import sys
-from lookup_utils import lookup_subcategory, lookup_type, lookup_manufacturer, lookup_uom, lookup_vendor
+
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_reference import ReferenceResolver
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +29,9 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# Reference tables are bulk-loaded once instead of queried per row
+resolver = ReferenceResolver(base_url=BASE_URL)
+
 # Load the CSV file paths
 input_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\Production\Activate_Items.csv"
 output_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\Production\Patch_Items_Update.csv"
@@ -59,11 +65,11 @@ for index, row in df.iterrows():
     product_id = row["ProductID"]
 
     # Perform lookups
-    subcategory_id = lookup_subcategory(row["subCategory"], BASE_URL, headers)
-    type_id = lookup_type(row["ProductType"], BASE_URL, headers)
-    manufacturer_id = lookup_manufacturer(row["Manufacturer"], BASE_URL, headers)
-    uom_id = lookup_uom(row["uom"], BASE_URL, headers)
-    vendor_id = lookup_vendor(row["PreferredVendor"], BASE_URL, headers)
+    subcategory_id = resolver.lookup_subcategory(row["category"], row["subCategory"])
+    type_id = resolver.lookup_type(row["ProductType"])
+    manufacturer_id = resolver.lookup_manufacturer(row["Manufacturer"])
+    uom_id = resolver.lookup_uom(row["uom"])
+    vendor_id = resolver.lookup_vendor(row["PreferredVendor"])
 
     # Determine the value for "RenewableItem"
     renewable_item_value = True if row["RenewableItem"].strip().lower() == "yes" else False
@@ -1,24 +1,22 @@
 import os
+import sys
 import pandas as pd
-import requests
-from dotenv import load_dotenv
 import numpy as np
 
-# Load environment variables
-load_dotenv()
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_client import BASE_URL, get_session
+from cw_journal import SUCCESS, RunJournal, parse_run_args
+from cw_reference import ReferenceResolver
 
-# Accessing API variables from environment file
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
+# Shared keep-alive session with the API version pinned
+session = get_session(accept="application/vnd.connectwise.com+json; version=2023.1")
 
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE,
-    "Content-Type": "application/json",
-    "Accept": "application/vnd.connectwise.com+json; version=2023.1"
-}
+# Reference tables are bulk-loaded once and cached on disk between runs
+resolver = ReferenceResolver(
+    session=session,
+    cache_dir=r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\Production\reference_cache"
+)
 
 # Path to the CSV file and the output file
 csv_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\Production\All_Items_120224.csv"
@@ -55,78 +53,58 @@ def sanitize_string(value):
 
 # Lookup functions for subcategory, type, manufacturer, and unit of measure
 def lookup_subcategory(subcategory_name):
-    url = f"{BASE_URL}/procurement/subcategories"
-    params = {"conditions": f"name like '{subcategory_name}%'"}
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        result = response.json()
-        return result[0]['id'] if result else None
-    return None
+    return resolver.lookup_subcategory(None, subcategory_name)
 
 def lookup_type(type_name):
-    url = f"{BASE_URL}/procurement/types"
-    params = {"conditions": f"name like '{type_name}%'"}
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        result = response.json()
-        return result[0]['id'] if result else None
-    return None
+    return resolver.lookup_type(type_name)
 
 def lookup_manufacturer(manufacturer_name):
-    url = f"{BASE_URL}/procurement/manufacturers"
-    params = {"conditions": f"name like '{manufacturer_name}%'"}
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        result = response.json()
-        return result[0]['id'] if result else None
-    return None
+    return resolver.lookup_manufacturer(manufacturer_name)
 
 def lookup_uom(uom_name):
     if not uom_name:
         return None, "No UOM Specified"
-    
-    url = f"{BASE_URL}/procurement/unitOfMeasures"
-    params = {"conditions": f"name like '{uom_name}%'"}
-    response = requests.get(url, headers=headers, params=params)
-
-    uom_lookup_status = f"UOM Lookup Status: {response.status_code}"
-    if response.status_code == 200:
-        uoms = response.json()
-        if uoms:
-            uom_lookup_status += f" | UOM ID Found: {uoms[0]['id']}"
-            return uoms[0]['id'], uom_lookup_status
-    uom_lookup_status += " | UOM Not Found"
-    return None, uom_lookup_status
+
+    uom_id = resolver.lookup_uom(uom_name)
+    if uom_id is not None:
+        return uom_id, f"UOM Resolved: {uom_id}"
+    return None, "UOM Unresolved: no UOM matches"
 
 def lookup_vendor(preferred_vendor):
     if not preferred_vendor:
         return None, "No Preferred Vendor Specified"
 
-    lookup_url = f"{BASE_URL}/company/companies"
-    lookup_params = {"conditions": f"name like '{preferred_vendor}%'"}
-    lookup_response = requests.get(lookup_url, headers=headers, params=lookup_params)
-
-    vendor_lookup_status = f"Vendor Lookup Status: {lookup_response.status_code}"
-    if lookup_response.status_code == 200:
-        companies = lookup_response.json()
-        if companies:
-            vendor_lookup_status += f" | Vendor ID Found: {companies[0]['id']}"
-            return companies[0]['id'], vendor_lookup_status
-    vendor_lookup_status += " | Vendor Not Found"
-    return None, vendor_lookup_status
-
-# Prepare output CSV for writing results
-with open(output_path, mode='w', newline='', encoding='utf-8') as output_file:
-    fieldnames = ["ProductID", "CW_ID", "HTTP_Status", "Error_Message", "Vendor_Lookup_Status", "UOM_Lookup_Status"]
-    writer = pd.DataFrame(columns=fieldnames)
-    writer.to_csv(output_file, mode='a', index=False, header=True, encoding='utf-8')
+    vendor_id = resolver.lookup_vendor(preferred_vendor)
+    if vendor_id is not None:
+        return vendor_id, f"Vendor Resolved: {vendor_id}"
+    return None, "Vendor Unresolved: no company matches"
+
+# Journal of created products; --resume skips the ones already created
+args = parse_run_args("Create catalog items from the NetSuite item export.", f"{output_path}.journal")
+journal = RunJournal(args.journal, resume=args.resume, fresh=args.fresh)
+
+# Prepare output CSV for writing results; a resumed run appends to it
+if not (args.resume and os.path.exists(output_path)):
+    with open(output_path, mode='w', newline='', encoding='utf-8') as output_file:
+        fieldnames = ["ProductID", "CW_ID", "HTTP_Status", "Error_Message", "Vendor_Lookup_Status", "UOM_Lookup_Status"]
+        writer = pd.DataFrame(columns=fieldnames)
+        writer.to_csv(output_file, mode='a', index=False, header=True, encoding='utf-8')
 
 # Read CSV in chunks and process rows
 chunk_iter = pd.read_csv(csv_path, usecols=columns_to_read, chunksize=1, encoding='utf-8')
 
+# Products submitted in this run, not counting the ones skipped from the journal
+submitted = 0
+
 # Process first 5 records for initial check
-for idx, chunk in enumerate(chunk_iter):
+for chunk in chunk_iter:
     row = chunk.iloc[0].fillna("")  # Replace NaN with empty strings for each row
+
+    # Skip products created by an earlier run
+    if journal.is_done(row["ProductID"]):
+        print(f"Skipping Product {row['ProductID']}: already created as CW_ID={journal.created_id(row['ProductID'])}")
+        continue
+    submitted += 1
     row['RenewableItem'] = yes_no_to_bool(row['RenewableItem'])
 
     # Retain the original value of "Class"
@@ -169,7 +147,7 @@ for idx, chunk in enumerate(chunk_iter):
 
     # Post the product to the catalog
     catalog_url = f"{BASE_URL}/procurement/catalog"
-    catalog_response = requests.post(catalog_url, headers=headers, json=catalog_data)
+    catalog_response = session.post(catalog_url, json=catalog_data)
 
     # Handle response
     if catalog_response.status_code == 201:
@@ -181,6 +159,10 @@ for idx, chunk in enumerate(chunk_iter):
         http_status = catalog_response.status_code
         error_message = catalog_response.text
 
+    # Record the outcome before moving on so a crash can resume after this row
+    journal.record(row["ProductID"], SUCCESS if catalog_response.status_code == 201 else "failed",
+                   created_id=cw_id or None, http_status=http_status)
+
     # Append result to output CSV
     with open(output_path, mode='a', newline='', encoding='utf-8') as output_file:
         writer = pd.DataFrame({
@@ -196,8 +178,10 @@ for idx, chunk in enumerate(chunk_iter):
     print(f"Processed Product {row['ProductID']}: HTTP_Status={http_status}, Error={error_message}")
 
     # Pause after processing the first 5 records
-    if idx == 4:
+    if submitted == 5:
         proceed = input("The first 5 records have been processed. Do you want to continue? (yes/no): ").strip().lower()
         if proceed != "yes":
             print("Exiting the script as requested.")
             break
+
+journal.close()
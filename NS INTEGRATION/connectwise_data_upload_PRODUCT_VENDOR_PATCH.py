@@ -4,6 +4,10 @@ import requests
 from dotenv import load_dotenv
 import sys
 
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_fields import get_json
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +28,10 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# Keep-alive session for the sandbox
+session = requests.Session()
+session.headers.update(headers)
+
 # Load the CSV file paths
 input_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\All_Items_103124.csv"
 output_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\Items\All_Items_103124_Update.csv"
@@ -69,9 +77,14 @@ def make_request(url, headers, params):
         print(f"Request failed: {e}")
         return None
 
-# Verify update by re-fetching the record
+# Verify update by re-fetching only the subcategory of the record
 def verify_update(catalog_id, subcategory_id):
-    data = make_request(f"{BASE_URL}/procurement/catalog/{catalog_id}", headers, {})
+    try:
+        data = get_json(f"{BASE_URL}/procurement/catalog/{catalog_id}", "product_vendor_patch.verify_update",
+                        session=session)
+    except requests.RequestException as e:
+        print(f"Request failed: {e}")
+        return False
     if data and data.get('subcategory', {}).get('id') == subcategory_id:
         return True
     return False
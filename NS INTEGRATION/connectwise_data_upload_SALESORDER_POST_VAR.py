@@ -1,9 +1,14 @@
 import os
+import sys
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 from datetime import datetime
 
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_contacts import CompanyContactCache
+
 # Load environment variables
 load_dotenv()
 
@@ -81,16 +86,14 @@ def fetch_opportunity_by_document_number(document_number, base_url, headers):
         return data[0] if data else None
     return None
 
+# Default contact of every company in the file, prefetched in chunked queries
+contact_cache = CompanyContactCache(base_url=BASE_URL)
+contact_cache.prefetch(company_id for company_id in contacts_df['CompanyID'] if company_id)
+
 def get_contact_id(company_id):
     if not company_id:
         return None
-    api_url = f"{BASE_URL}/company/contacts"
-    params = {"conditions": f"(company/id = {company_id})"}
-    response = requests.get(api_url, headers=headers, params=params)
-    if response.status_code == 200:
-        contacts = response.json()
-        return contacts[0]['id'] if contacts else None
-    return None
+    return contact_cache.contact_id(company_id)
 
 def post_sales_order(row):
     opportunity = fetch_opportunity_by_document_number(row['DocumentNumber'], BASE_URL, headers)
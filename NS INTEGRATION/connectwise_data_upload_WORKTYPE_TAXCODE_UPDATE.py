@@ -1,22 +1,14 @@
 import os
+import sys
 import pandas as pd
-import requests
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_async import DEFAULT_CONCURRENCY, run_rows
+from cw_client import BASE_URL, get_session
 
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE,
-    "Content-Type": "application/json"
-}
+# Shared keep-alive session sized for the number of rows in flight
+session = get_session(pool_size=DEFAULT_CONCURRENCY)
 
 # Load the CSV file paths
 input_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integration\TaxCodes\CW_WorkType_TaxCode_Output.csv"
@@ -25,11 +17,8 @@ output_file_path = r"c:\users\jmoore\documents\connectwise\integration\NS_Integr
 # Read CSV file and include necessary columns
 df = pd.read_csv(input_file_path)
 
-# Prepare an empty list to store the output data
-output_data = []
-
-# Loop through each row in the DataFrame to perform the PATCH request
-for index, row in df.iterrows():
+# Function to perform the PATCH request for one row
+def update_work_type(row):
     work_type_id = row['id']
     name = row['name']
 
@@ -44,19 +33,29 @@ for index, row in df.iterrows():
 
     # Make the PATCH request
     url = f"{BASE_URL}/time/workTypes/{work_type_id}"
-    response = requests.patch(url, headers=headers, json=payload)
+    response = session.patch(url, json=payload)
 
     # Check for successful response
     if response.status_code == 200:
         updated_data = response.json()
         integration_xref = updated_data.get("integrationXRef", "SI080001")  # Use default if not present in response
-        output_data.append({
+        return {
             "id": work_type_id,
             "name": name,
             "integrationXRef": integration_xref
-        })
-    else:
-        print(f"Failed to update work type ID {work_type_id}. Status Code: {response.status_code}")
+        }
+
+    print(f"Failed to update work type ID {work_type_id}. Status Code: {response.status_code}")
+    return None
+
+# Report request errors and leave the row out of the output
+def update_error(row, error):
+    print(f"Failed to update work type ID {row['id']}. Error: {error}")
+    return None
+
+# Run the PATCH requests concurrently; results keep the input order
+results = run_rows(df.to_dict("records"), update_work_type, on_error=update_error)
+output_data = [result for result in results if result is not None]
 
 # Convert output data to a DataFrame and save it to a new CSV file
 output_df = pd.DataFrame(output_data)
@@ -1,22 +1,14 @@
 import os
+import sys
 import pandas as pd
-import requests
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Shared ConnectWise helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cw_async import DEFAULT_CONCURRENCY, run_rows
+from cw_client import BASE_URL, get_session
 
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Prepare headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE,
-    "Content-Type": "application/json"
-}
+# Shared keep-alive session sized for the number of rows in flight
+session = get_session(pool_size=DEFAULT_CONCURRENCY)
 
 # Load the CSV file
 input_file = r"c:\users\jmoore\documents\connectwise\integration\Keep_Products_updated_ID.csv"
@@ -26,11 +18,8 @@ output_file = r"c:\users\jmoore\documents\connectwise\integration\product_CAT_up
 df = pd.read_csv(input_file)
 
 # Columns expected: 'id', 'Category', 'Subcategory'
-# Initialize an empty list to store the results
-results = []
-
-# Iterate through each row and send a PATCH request
-for index, row in df.iterrows():
+# Function to send the PATCH request for one row
+def patch_product(row):
     product_id = row['id']
     category_id = row['Category']
     subcategory_id = row['Subcategory']
@@ -57,7 +46,7 @@ for index, row in df.iterrows():
     ]
 
     # Make the PATCH request
-    response = requests.patch(url, json=payload, headers=headers)
+    response = session.patch(url, json=payload)
 
     # Check the response
     if response.status_code == 200:
@@ -65,13 +54,24 @@ for index, row in df.iterrows():
     else:
         result_status = f"Failed - {response.status_code}: {response.text}"
     
-    # Append result to the results list
-    results.append({
+    return {
         "Product ID": product_id,
         "Category ID": category_id,
         "Subcategory ID": subcategory_id,
         "Status": result_status
-    })
+    }
+
+# Record request errors in the same output shape
+def patch_error(row, error):
+    return {
+        "Product ID": row['id'],
+        "Category ID": row['Category'],
+        "Subcategory ID": row['Subcategory'],
+        "Status": f"Failed - {error}"
+    }
+
+# Send the PATCH requests concurrently; results keep the input order
+results = run_rows(df.to_dict("records"), patch_product, on_error=patch_error)
 
 # Convert the results list to a DataFrame
 results_df = pd.DataFrame(results)
@@ -1,7 +1,10 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from cw_client import create_session
+from cw_ratelimit import RateLimiter
 
 # Load environment variables
 load_dotenv()
@@ -15,16 +18,35 @@ REGULAR_QUOTE_TEMPLATE_ID = "q638615886842932838rVUfSEv"
 ERATE_QUOTE_TEMPLATE_ID = "q638615888842148413ohzNAvc"
 RENEWAL_QUOTE_TEMPLATE_ID = "q638615890384714830mlNHtxm"
 
+# Custom_Form value to (template ID, template name)
+QUOTE_TEMPLATES = {
+    "Synergetics - Quote": (REGULAR_QUOTE_TEMPLATE_ID, "Regular Quote"),
+    "Synergetics - e-Rate Quote": (ERATE_QUOTE_TEMPLATE_ID, "Erate Quote"),
+    "Synergetics Quote - Contract Renewals": (RENEWAL_QUOTE_TEMPLATE_ID, "Renewal Quote"),
+}
+
+# Quotes being copied and patched at the same time
+MAX_CONCURRENT_QUOTES = int(os.getenv("SELL_CONCURRENCY", "8"))
+
+# Sell requests per second; Sell has its own limits, separate from the Manage API
+SELL_RATE_LIMIT = float(os.getenv("SELL_RATE_LIMIT", "5"))
+
 # Headers for requests
 headers = {
     "Authorization": "Basic " + AUTH_ID,
     "Content-Type": "application/json"
 }
 
+# Keep-alive session for Sell, pooled for the concurrent quotes. A throttled copy is
+# reported rather than resent, since Sell does not promise a 429 left nothing behind.
+session = create_session(pool_size=MAX_CONCURRENT_QUOTES, headers=headers,
+                         limiter=RateLimiter(rate=SELL_RATE_LIMIT, max_rate=SELL_RATE_LIMIT),
+                         retry_throttled_writes=False)
+
 def post_quote_by_template(template_id, quote_data, quote_template_name):
     try:
         # Post the quote to the specified endpoint
-        response = requests.post(url=f"{SELL_URL}/quotes/copyById/{template_id}", headers=headers, json=quote_data)
+        response = session.post(url=f"{SELL_URL}/quotes/copyById/{template_id}", json=quote_data)
         response.raise_for_status()
 
         # Get the quote ID from the response (assuming it's in JSON format)
@@ -54,13 +76,24 @@ def patch_quote(quote_id, title, document_number):
     
     try:
         # Send the PATCH request to update the quote name and originalQuoteId
-        patch_response = requests.patch(url=f"{SELL_URL}/quotes/{quote_id}", headers=headers, json=patch_data)
+        patch_response = session.patch(url=f"{SELL_URL}/quotes/{quote_id}", json=patch_data)
         patch_response.raise_for_status()
         print(f"Quote updated successfully for Quote ID: {quote_id}")
+        return True
     except requests.exceptions.HTTPError as errh:
         print(f"HTTP Error (PATCH): {errh}")
     except requests.exceptions.RequestException as err:
         print(f"Request Error (PATCH): {err}")
+    return False
+
+def copy_and_patch_quote(template_id, quote_template_name, quote_data, title, document_number):
+    # Copy the template, then patch the new quote; the patch only runs once the copy succeeded
+    quote_id = post_quote_by_template(template_id, quote_data, quote_template_name)
+    if not quote_id:
+        return "Copy failed"
+    if not patch_quote(quote_id, title, document_number):
+        return f"Patch failed ({quote_id})"
+    return "Success"
 
 def process_csv_and_post_quotes(file_path):
     try:
@@ -79,33 +112,30 @@ def process_csv_and_post_quotes(file_path):
         print("The 'Custom_Form', 'Title', or 'Document_Number' column is missing in the CSV file.")
         return
 
-    for index, row in df.iterrows():
-        custom_form_value = row.get("Custom_Form", "")
-        title = row.get("Title", "")
-        document_number = row.get("Document_Number", "")
+    # Each row's copy and patch run as one task, with up to MAX_CONCURRENT_QUOTES rows in flight
+    futures = {}
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUOTES) as executor:
+        for index, row in df.iterrows():
+            custom_form_value = row.get("Custom_Form", "")
+            title = row.get("Title", "")
+            document_number = row.get("Document_Number", "")
 
-        quote_data = {
-            "details": row.to_dict()
-        }
+            quote_data = {
+                "details": row.to_dict()
+            }
+
+            # Determine the correct template ID based on Custom_Form value
+            if custom_form_value not in QUOTE_TEMPLATES:
+                print(f"Skipping row {index}, 'Custom_Form' value '{custom_form_value}' is not recognized.")
+                continue
+            template_id, quote_template_name = QUOTE_TEMPLATES[custom_form_value]
+
+            futures[index] = executor.submit(copy_and_patch_quote, template_id, quote_template_name,
+                                             quote_data, title, document_number)
 
-        # Determine the correct template ID based on Custom_Form value
-        if custom_form_value == "Synergetics - Quote":
-            template_id = REGULAR_QUOTE_TEMPLATE_ID
-            quote_template_name = "Regular Quote"
-        elif custom_form_value == "Synergetics - e-Rate Quote":
-            template_id = ERATE_QUOTE_TEMPLATE_ID
-            quote_template_name = "Erate Quote"
-        elif custom_form_value == "Synergetics Quote - Contract Renewals":
-            template_id = RENEWAL_QUOTE_TEMPLATE_ID
-            quote_template_name = "Renewal Quote"
-        else:
-            print(f"Skipping row {index}, 'Custom_Form' value '{custom_form_value}' is not recognized.")
-            continue
-
-        quote_id = post_quote_by_template(template_id, quote_data, quote_template_name)
-
-        if quote_id:
-            patch_quote(quote_id, title, document_number)
+    outcomes = pd.Series({index: future.result() for index, future in futures.items()}, dtype=object)
+    print(f"Processed {len(outcomes)} quotes: {(outcomes == 'Success').sum()} succeeded, "
+          f"{(outcomes != 'Success').sum()} failed, {len(df) - len(outcomes)} skipped")
 
 if __name__ == '__main__':
     file_path = input("Please enter the path to the CSV file: ")
@@ -2,6 +2,7 @@ import os
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from cw_batch import fetch_by_ids
 
 # Load environment variables
 load_dotenv()
@@ -25,12 +26,6 @@ sell_headers = {
     "Content-Type": "application/json"
 }
 
-manage_headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
-
 # CSV output path
 output_file_path = r"c:\users\jmoore\documents\connectwise\SalesOrders\OpenQuotesWithStatus.csv"
 
@@ -49,7 +44,7 @@ sell_params = {
 }
 
 # AND orderPorterTemplate!="ITROrders" AND orderPorterTemplate!="VAR_Sales" AND orderPorterTemplate!="Renewals"
-# List to collect final combined data
+# List to collect the quotes
 combined_data = []
 
 # Step 1: Pull active quotes from Sell
@@ -76,39 +71,6 @@ while True:
             "Order Porter Template": quote.get("orderPorterTemplate"),
             "Opportunity": quote.get("crmOpportunityId")
         }
-
-        crm_opp_id = quote.get("crmOpportunityId")
-
-        # Step 2: If crmOpportunityId exists, fetch the opportunity's status name
-        if crm_opp_id:
-            manage_endpoint = f"{BASE_URL}/sales/opportunities/{crm_opp_id}"
-            manage_params = {
-                "fields": "status/name"  # Request only the status name
-            }
-            manage_response = requests.get(manage_endpoint, headers=manage_headers, params=manage_params)
-
-            if manage_response.status_code == 200:
-                opp_data = manage_response.json()
-
-                if opp_data:
-                    # Check if status exists
-                    status_block = opp_data.get("status")
-                    if status_block and isinstance(status_block, dict):
-                        status_name = status_block.get("name")
-                        quote_record["Opportunity Status Name"] = status_name
-                    else:
-                        print(f"⚠️ Opportunity ID {crm_opp_id} has no status assigned.")
-                        quote_record["Opportunity Status Name"] = None
-                else:
-                    print(f"⚠️ Empty opportunity data returned for ID {crm_opp_id}.")
-                    quote_record["Opportunity Status Name"] = None
-            else:
-                print(f"❌ Failed to fetch Opportunity ID {crm_opp_id}: {manage_response.status_code} - {manage_response.text}")
-                quote_record["Opportunity Status Name"] = None
-        else:
-            # No crmOpportunityId
-            quote_record["Opportunity Status Name"] = None
-
         combined_data.append(quote_record)
 
     # Pagination: If fewer than a full page, stop
@@ -117,9 +79,33 @@ while True:
 
     sell_params["page"] += 1
 
+# Step 2: Fetch the status of every linked opportunity in chunked `id in (...)` queries
+df = pd.DataFrame(combined_data, columns=["Quote Name", "Quote Number", "Quote Version", "Quote ID", "Account Name",
+                                          "Quote Status", "Order Porter Template", "Opportunity"])
+opportunity_ids = pd.to_numeric(df["Opportunity"], errors="coerce").astype("Int64")
+
+try:
+    opportunities = fetch_by_ids(f"{BASE_URL}/sales/opportunities", opportunity_ids.dropna().astype(int).tolist(),
+                                 fields="id,status/name")
+except Exception as e:
+    print(f"❌ Failed to fetch opportunity statuses: {e}")
+    opportunities = []
+
+statuses = pd.DataFrame({
+    "Opportunity ID": pd.array([opp["id"] for opp in opportunities], dtype="Int64"),
+    "Opportunity Status Name": [(opp.get("status") or {}).get("name") for opp in opportunities]
+})
+
+# Join the statuses onto the quotes in one merge
+df["Opportunity ID"] = opportunity_ids
+df = df.merge(statuses, on="Opportunity ID", how="left").drop(columns="Opportunity ID")
+
+missing = opportunity_ids.notna() & df["Opportunity Status Name"].isna()
+if missing.any():
+    print(f"⚠️ {missing.sum()} quotes link to an opportunity with no status or that could not be found.")
+
 # Step 3: Export combined data to CSV
 if combined_data:
-    df = pd.DataFrame(combined_data)
     df.to_csv(output_file_path, index=False)
     print(f"✅ Successfully exported {len(df)} records to '{output_file_path}'")
 else:
@@ -1,22 +1,10 @@
-import os
 import pandas as pd
 import requests
-from dotenv import load_dotenv
+from cw_async import DEFAULT_CONCURRENCY, run_rows
+from cw_client import BASE_URL, get_session
 
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# API headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
+# Shared keep-alive session sized for the number of rows in flight
+session = get_session(pool_size=DEFAULT_CONCURRENCY)
 
 # Load CSV file
 csv_path = r"C:\users\jmoore\documents\connectwise\Company\MemberAccruals052825.csv"
@@ -26,17 +14,28 @@ df = pd.read_csv(csv_path)
 if 'id' not in df.columns or 'member' not in df.columns:
     raise ValueError("CSV must contain 'id' and 'member' columns.")
 
-# Iterate and delete accruals
-for index, row in df.iterrows():
+# Function to delete one accrual
+def delete_one_accrual(row):
     accrual_id = row['id']
     member = row['member']
     url = f"{BASE_URL}/system/members/{member}/accruals/{accrual_id}"
     
     try:
-        response = requests.delete(url, headers=headers)
+        response = session.delete(url)
         if response.status_code == 200 or response.status_code == 204:
-            print(f"Successfully deleted accrual ID {accrual_id} for member {member}")
+            return f"Successfully deleted accrual ID {accrual_id} for member {member}"
         else:
-            print(f"Failed to delete accrual ID {accrual_id} for member {member} - Status Code: {response.status_code}, Response: {response.text}")
+            return f"Failed to delete accrual ID {accrual_id} for member {member} - Status Code: {response.status_code}, Response: {response.text}"
     except requests.exceptions.RequestException as e:
-        print(f"Error deleting accrual ID {accrual_id} for member {member} - {e}")
+        return f"Error deleting accrual ID {accrual_id} for member {member} - {e}"
+
+# Function run per row; the outcome is printed as soon as it is known, so progress shows while rows run
+def delete_accrual(row):
+    result = delete_one_accrual(row)
+    print(result)
+    return result
+
+# Delete accruals concurrently, printing each outcome as it completes
+results = run_rows(df.to_dict("records"), delete_accrual)
+deleted = sum(1 for result in results if result.startswith("Successfully"))
+print(f"Deleted {deleted} of {len(results)} accruals")
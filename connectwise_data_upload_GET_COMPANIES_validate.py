@@ -2,6 +2,8 @@ import os
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from cw_match import CompanyMatcher, normalize_company_name
+from cw_paging import fetch_all_pages
 
 # Load environment variables
 load_dotenv()
@@ -17,28 +19,17 @@ headers = {
     "Authorization": "Basic " + AUTH_CODE
 }
 
-def get_companies_by_name(name_segment):
-    try:
-        # Use the name_segment to filter companies via API (name like %name_segment%)
-        params = {
-            "pageSize": 1000,
-            "conditions": f"(name like '%{name_segment}%')",  # Dynamic condition using name_segment
-            "fields": "id,identifier,name"  # Only retrieve id, identifier, and name fields
-        }
-        
-        # Make the API request
-        response = requests.get(url=f"{BASE_URL}/company/companies", headers=headers, params=params)
-        response.raise_for_status()  # Raise exception for HTTP errors
+# Lowest similarity score (0-100) that counts as a match
+MATCH_THRESHOLD = 85
 
-        # Check if the response is a list
-        response_data = response.json()
-        if isinstance(response_data, list):
-            # If the response is a list, treat it as the company data
-            return response_data
-        else:
-            print("Unexpected response format.")
-            return None
+# Keep-alive session for the sandbox
+session = requests.Session()
+session.headers.update(headers)
 
+def get_all_companies():
+    # Download the whole company list once, projected to id, identifier, and name
+    try:
+        return fetch_all_pages(f"{BASE_URL}/company/companies", {"fields": "id,identifier,name"}, session=session)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching companies from API: {e}")
         return None
@@ -48,36 +39,27 @@ def upload_and_compare_company_data():
     customer_file_path = r'c:\users\jmoore\documents\connectwise\projects\All_Customers_Data.csv'
     customer_df = pd.read_csv(customer_file_path)
 
-    # Extract the first, second, and third segments of the 'Name' column, if available
-    def extract_name_segments(name):
-        segments = name.split()
-        return segments[:3]  # Return the first three segments (or fewer if there are less)
-
-    # Apply the function to extract name segments
-    customer_df['Name_Segments'] = customer_df['Name'].apply(extract_name_segments)
-
-    # Create DataFrames to store matched and unmatched customers
-    matched_customers = pd.DataFrame()
-    unmatched_customers = pd.DataFrame()
-
-    # Loop through each customer and fetch companies that match
-    for index, row in customer_df.iterrows():
-        name_segments = row['Name_Segments']
-        is_matched = False  # Flag to check if customer was matched
-
-        for segment in name_segments:  # Loop through each segment (first, second, third) of the name
-            print(f"Fetching companies for name segment: {segment}")
-            matched_companies = get_companies_by_name(segment)
-
-            if matched_companies:
-                # If we found matching companies, append this customer to the matched customers DataFrame using pd.concat
-                matched_customers = pd.concat([matched_customers, pd.DataFrame([row])], ignore_index=True)
-                is_matched = True
-                break  # Stop searching once a match is found for this customer
-
-        if not is_matched:
-            # If no match was found, append this customer to the unmatched customers DataFrame
-            unmatched_customers = pd.concat([unmatched_customers, pd.DataFrame([row])], ignore_index=True)
+    companies = get_all_companies()
+    if companies is None:
+        return
+    print(f"Matching {len(customer_df)} customers against {len(companies)} companies")
+
+    # Score every customer against the local company index; blank names are reported as unmatched
+    matcher = CompanyMatcher(companies)
+    matches = [
+        matcher.match(name, min_score=MATCH_THRESHOLD) if normalize_company_name(name) else (None, 0)
+        for name in customer_df['Name'].fillna('')
+    ]
+
+    customer_df['CW_ID'] = [company["id"] if company else None for company, _ in matches]
+    customer_df['CW_Identifier'] = [company.get("identifier") if company else None for company, _ in matches]
+    customer_df['CW_Name'] = [company.get("name") if company else None for company, _ in matches]
+    customer_df['Match_Score'] = [round(score, 1) for _, score in matches]
+
+    # Split matched and unmatched customers in one step
+    is_matched = customer_df['CW_ID'].notna()
+    matched_customers = customer_df[is_matched]
+    unmatched_customers = customer_df[~is_matched]
 
     # Log the matched customers
     if not matched_customers.empty:
@@ -1,86 +1,43 @@
 import os
 import pandas as pd
-import requests
-from dotenv import load_dotenv
+from cw_mirror import load_entity, open_mirror, sync_entity
 
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE
-}
-
-# Function to get products based on identifier from the API
-def get_product_by_identifier(identifier):
-    try:
-        # Parameters for filtering the API response
-        params = {
-            "pageSize": 1000,
-            "conditions": f'catalogItem/identifier="{identifier}"',  # Dynamically set identifier
-            "fields": "id,catalogItem/identifier,description,opportunity/id,salesOrder/id,agreement/id"  # Include specified fields
-        }
-        
-        # Make the API request
-        response = requests.get(url=f"{BASE_URL}/procurement/products", headers=headers, params=params)
-        response.raise_for_status()  # Raise exception for HTTP errors
-
-        # Parse response data
-        response_data = response.json()
-        if isinstance(response_data, list):
-            products_data = response_data
-        elif isinstance(response_data, dict):
-            products_data = response_data.get("items", [])
-        else:
-            print("Unexpected response format.")
-            return None
-
-        if not products_data:
-            print(f"No product data found for identifier: {identifier}")
-            return None
-
-        # Normalize data and flatten nested fields
-        products_df = pd.json_normalize(products_data)
+# Function to select the products for the given identifiers from the local mirror
+def get_products_by_identifiers(products_df, identifiers):
+    if products_df.empty or 'catalogItem.identifier' not in products_df.columns:
+        return None
 
-        # Handle missing columns and ensure proper renaming
-        products_df.rename(columns={
-            'catalogItem.identifier': 'catalogItem',
-            'opportunity.id': 'opportunity',
-            'salesOrder.id': 'salesOrder',
-            'agreement.id': 'agreement'
-        }, inplace=True)
+    # Identifier matching is case-insensitive, as in the API conditions
+    wanted = pd.DataFrame({'identifier': identifiers})
+    wanted['match_key'] = wanted['identifier'].astype(str).str.casefold()
+    products_df = products_df.assign(match_key=products_df['catalogItem.identifier'].astype(str).str.casefold())
+    products_df = wanted[['match_key']].merge(products_df, on='match_key', how='inner')
 
-        # Convert 'opportunity', 'salesOrder', and 'agreement' columns to string dtype before filling
-        if 'opportunity' not in products_df.columns:
-            products_df['opportunity'] = 'None'
-        else:
-            products_df['opportunity'] = products_df['opportunity'].astype(str).fillna('None')
+    missing = set(wanted['match_key']) - set(products_df['match_key'])
+    for identifier in wanted.loc[wanted['match_key'].isin(missing), 'identifier']:
+        print(f"No product data found for identifier: {identifier}")
 
-        if 'salesOrder' not in products_df.columns:
-            products_df['salesOrder'] = 'None'
-        else:
-            products_df['salesOrder'] = products_df['salesOrder'].astype(str).fillna('None')
+    if products_df.empty:
+        return None
 
-        if 'agreement' not in products_df.columns:
-            products_df['agreement'] = 'None'
+    # Handle missing columns and ensure proper renaming
+    products_df = products_df.rename(columns={
+        'catalogItem.identifier': 'catalogItem',
+        'opportunity.id': 'opportunity',
+        'salesOrder.id': 'salesOrder',
+        'agreement.id': 'agreement'
+    })
+
+    # IDs are shown as whole numbers, or 'None' when the product has no link
+    for column in ['opportunity', 'salesOrder', 'agreement']:
+        if column not in products_df.columns:
+            products_df[column] = 'None'
         else:
-            products_df['agreement'] = products_df['agreement'].astype(str).fillna('None')
-
-        # Order columns as specified
-        column_order = ["catalogItem", "description", "opportunity", "salesOrder", "agreement"]
-        products_df = products_df.reindex(columns=column_order, fill_value='')
+            products_df[column] = products_df[column].map(lambda value: 'None' if pd.isna(value) else str(int(value)))
 
-        return products_df
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching products from API for identifier {identifier}: {e}")
-        return None
+    # Order columns as specified
+    column_order = ["catalogItem", "description", "opportunity", "salesOrder", "agreement"]
+    return products_df.reindex(columns=column_order, fill_value='')
 
 # Function to read identifiers from CSV file
 def read_identifiers_from_csv(file_path):
@@ -105,7 +62,7 @@ def write_products_to_csv(dataframe, file_path):
     except Exception as e:
         print(f"Error writing to file: {e}")
 
-# Main function to loop over identifiers and fetch product data
+# Main function to look up product data for the identifiers
 def upload_product_data():
     input_file_path = r'c:\users\jmoore\documents\connectwise\projects\product_data.csv'  # Path to CSV with identifiers
     output_file_path = r'c:\users\jmoore\documents\connectwise\projects\update_product_data.csv'  # Output CSV path
@@ -115,10 +72,12 @@ def upload_product_data():
         print("No identifiers to process.")
         return
 
-    for identifier in identifiers:
-        products_df = get_product_by_identifier(identifier)
-        if products_df is not None:
-            write_products_to_csv(products_df, output_file_path)
+    # Bring the local product mirror up to date and query it locally
+    mirror = open_mirror()
+    sync_entity(mirror, "products")
+    products_df = get_products_by_identifiers(load_entity(mirror, "products"), identifiers)
+    if products_df is not None:
+        write_products_to_csv(products_df, output_file_path)
 
 # Call the function to load and upload product data
 upload_product_data()
@@ -2,6 +2,7 @@ import os
 import pandas as pd
 import requests
 from dotenv import load_dotenv
+from cw_sink import ResultSink
 
 # Load environment variables
 load_dotenv()
@@ -21,9 +22,8 @@ headers = {
 catalog_output_path = r'c:\users\jmoore\documents\connectwise\products\lenovoproducts.csv'
 product_details_output_path = r'c:\users\jmoore\documents\connectwise\products\lenovoproduct_details.csv'
 
-# Function to retrieve detailed product info by catalog item ID
-def get_product_details_by_catalog_id(catalog_ids):
-    product_details = []
+# Function to retrieve detailed product info by catalog item ID, writing each result to the sink
+def get_product_details_by_catalog_id(catalog_ids, sink):
     for catalog_id in catalog_ids:
         params = {
             "conditions": f"catalogItem/id = {catalog_id}",
@@ -32,11 +32,9 @@ def get_product_details_by_catalog_id(catalog_ids):
         response = requests.get(f"{BASE_URL}/procurement/products", headers=headers, params=params)
         if response.status_code == 200:
             data = response.json()
-            if data:  # Only add non-empty results
-                product_details.extend(data)
+            sink.write_rows(data)
         else:
             print(f"Failed to get product for catalog ID {catalog_id}: {response.status_code}")
-    return product_details
 
 # --- Main script logic ---
 # Get catalog items filtered by Lenovo manufacturer
@@ -61,12 +59,12 @@ if response.status_code == 200:
     
     # Get product details for each catalog item
     catalog_ids = df_catalog['id'].tolist()
-    product_details = get_product_details_by_catalog_id(catalog_ids)
-    
-    # Convert product details to DataFrame and export
-    if product_details:
-        df_products = pd.json_normalize(product_details)
-        df_products.to_csv(product_details_output_path, index=False)
+    # Stream product details to CSV as they arrive, flattened like json_normalize
+    detail_columns = ["catalogItem.id", "catalogItem.identifier", "opportunity.id", "salesOrder.id"]
+    with ResultSink(product_details_output_path, fieldnames=detail_columns, flatten=True) as sink:
+        get_product_details_by_catalog_id(catalog_ids, sink)
+
+    if sink.count:
         print(f"Product details saved to {product_details_output_path}")
     else:
         print("No product details found.")
@@ -1,53 +1,23 @@
-import os
 import pandas as pd
 import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# API headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
+from cw_client import BASE_URL
+from cw_paging import fetch_all_pages
 
 # API endpoint
 endpoint = f"{BASE_URL}/project/projects"
 
 # Fetch all projects data
 def get_projects():
-    all_projects = []
-    page = 1
-    page_size = 100  # Adjust as needed
-
-    while True:
-        params = {
-            "page": page,
-            "pageSize": page_size,
-            "conditions": "((status/id=8 OR status/id=2) AND estimatedEnd>=[2025-02-01T00:00:00Z] AND estimatedEnd<=[2025-05-31T23:59:59Z])",
-            "fields": "id,actualHours,status/name,percentComplete,estimatedEnd"
-        }
-
-        response = requests.get(endpoint, headers=headers, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            if not data:
-                break
-            all_projects.extend(data)
-            page += 1
-        else:
-            print(f"Failed to fetch data: {response.status_code} - {response.text}")
-            break
-
-    return all_projects
+    params = {
+        "conditions": "((status/id=8 OR status/id=2) AND estimatedEnd>=[2025-02-01T00:00:00Z] AND estimatedEnd<=[2025-05-31T23:59:59Z])",
+        "fields": "id,actualHours,status/name,percentComplete,estimatedEnd"
+    }
+
+    try:
+        return fetch_all_pages(endpoint, params)
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to fetch data: {e}")
+        return []
 
 # Retrieve data
 projects = get_projects()
@@ -1,131 +1,61 @@
-import os
-import pandas as pd
-import requests
-from dotenv import load_dotenv
+from cw_batch import fetch_by_ids, fetch_each
+from cw_catalog import load_catalog_custom_field_index
+from cw_client import BASE_URL
+from cw_paging import fetch_all_pages
+from cw_sink import ResultSink
 
-# Load environment variables
-load_dotenv()
+# API endpoints
+orders_endpoint = f"{BASE_URL}/sales/orders"
+products_endpoint = f"{BASE_URL}/procurement/products"
+conversions_endpoint = f"{BASE_URL}/sales/orders/conversions/{{id}}"
 
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
+# Output and cache file paths
+output_path = r"C:\Users\jmoore\Documents\ConnectWise\Sales Orders\SoProducts.csv"
+renewable_cache_path = r"C:\Users\jmoore\Documents\ConnectWise\Sales Orders\catalog_renewable_index.json"
 
-# API headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE,
-    "Content-Type": "application/json"
-}
-
-# API endpoint for sales orders
-orders_endpoint = f"{BASE_URL}/sales/orders"
+# Catalog custom field holding the Renewable flag
+RENEWABLE_FIELD_ID = 80
 
 # Parameters for API request to retrieve sales order IDs
 params = {
     "conditions": 'orderDate>=[2025-01-01] AND orderDate<=[2025-03-04] AND (department/id=23 OR department/id=26)',
-    "fields": 'id',
-    "page": 1,
-    "pageSize": 1000  # Adjust based on API limits
+    "fields": 'id'
 }
 
-def get_conversions(order_id):
-    """
-    Retrieve conversions for a given sales order ID.
-    """
-    conversions_endpoint = f"{BASE_URL}/sales/orders/conversions/{order_id}"
-    conversions_response = requests.get(conversions_endpoint, headers=headers)
-
-    if conversions_response.status_code == 200:
-        conversions_data = conversions_response.json()
-        return conversions_data  # Return conversion data as-is (list or dict)
-    else:
-        print(f"Failed to retrieve conversions for Sales Order {order_id}. Status Code: {conversions_response.status_code}")
-        return None
+# Every page of sales orders in the window
+try:
+    sales_order_ids = [order["id"] for order in fetch_all_pages(orders_endpoint, params)]
+except Exception as e:
+    print(f"Failed to retrieve sales order IDs: {e}")
+    raise SystemExit(1)
+print(f"Retrieved {len(sales_order_ids)} sales orders")
 
-def get_custom_field_value(product_name):
-    """
-    Lookup product in the catalog using identifier and retrieve customField ID 80.
-    """
-    catalog_endpoint = f"{BASE_URL}/procurement/catalog"
-    catalog_params = {"conditions": f'identifier like "{product_name}%"', "fields": "customFields"}
-    
-    catalog_response = requests.get(catalog_endpoint, headers=headers, params=catalog_params)
+# Products of all orders in chunked `salesOrder/id in (...)` queries, grouped by order
+products_by_order = {order_id: [] for order_id in sales_order_ids}
+for product in fetch_by_ids(products_endpoint, sales_order_ids, field="salesOrder/id",
+                            fields="id,salesOrder/id,catalogItem/id,catalogItem/identifier"):
+    products_by_order[product["salesOrder"]["id"]].append(product)
 
-    if catalog_response.status_code == 200:
-        catalog_data = catalog_response.json()
-        if catalog_data:
-            # Extract custom field ID 80
-            for field in catalog_data[0].get("customFields", []):
-                if field.get("id") == 80:
-                    return field.get("value", "N/A")  # Return custom field value or "N/A" if not found
-    else:
-        print(f"Failed to retrieve catalog data for {product_name}. Status Code: {catalog_response.status_code}")
-    
-    return "N/A"  # Default value if not found
+# Conversions for all orders concurrently; the endpoint has no bulk form
+conversions_by_order = fetch_each(conversions_endpoint, sales_order_ids)
 
-# Making the API request for sales order IDs
-response = requests.get(orders_endpoint, headers=headers, params=params)
+# Renewable flag for every catalog item from one cached catalog scan
+renewable_index = load_catalog_custom_field_index(RENEWABLE_FIELD_ID, cache_path=renewable_cache_path)
 
-if response.status_code == 200:
-    data = response.json()
-    sales_order_ids = [order["id"] for order in data]
-
-    all_products = []
-
-    # Loop through each sales order ID to get its product IDs and conversions
+with ResultSink(output_path) as sink:
     for order_id in sales_order_ids:
-        order_details_endpoint = f"{BASE_URL}/sales/orders/{order_id}"
-        order_params = {"fields": "productIds"}  # Request only product IDs
-
-        order_response = requests.get(order_details_endpoint, headers=headers, params=order_params)
-
-        if order_response.status_code == 200:
-            order_data = order_response.json()
-            product_ids = order_data.get("productIds", [])
-
-            # Fetch conversion data
-            conversions = get_conversions(order_id)
-
-            # Convert conversions data to a string (or handle differently based on format)
-            conversions_str = ", ".join([str(conv) for conv in conversions]) if conversions else "None"
-
-            for product_id in product_ids:
-                # Fetch product details from procurement API
-                product_details_endpoint = f"{BASE_URL}/procurement/products/{product_id}"
-                product_params = {"fields": "catalogItem/identifier"}
-
-                product_response = requests.get(product_details_endpoint, headers=headers, params=product_params)
-
-                if product_response.status_code == 200:
-                    product_data = product_response.json()
-                    product_name = product_data.get("catalogItem", {}).get("identifier", "Unknown")
-
-                    # Fetch custom field value for the product
-                    custom_field_value = get_custom_field_value(product_name)
-                else:
-                    print(f"Failed to retrieve details for Product ID {product_id}. Status Code: {product_response.status_code}")
-                    product_name = "Unknown"
-                    custom_field_value = "N/A"
-
-                all_products.append({
-                    "Sales Order ID": order_id,
-                    "Product ID": product_id,
-                    "Product Name": product_name,
-                    "Renewable": custom_field_value,  # New column for custom field value
-                    "Conversions": conversions_str  # Adding conversion data
-                })
-        else:
-            print(f"Failed to retrieve product IDs for Sales Order {order_id}. Status Code: {order_response.status_code}")
-
-    # Convert to DataFrame
-    df = pd.DataFrame(all_products)
-
-    # Define the output file path
-    output_path = r"C:\Users\jmoore\Documents\ConnectWise\Sales Orders\SoProducts.csv"
-
-    # Save to CSV
-    df.to_csv(output_path, index=False)
-    print(f"Sales order products successfully saved to {output_path}")
-else:
-    print(f"Failed to retrieve sales order IDs. Status Code: {response.status_code}, Response: {response.text}")
+        # Convert conversions data to a string (or handle differently based on format)
+        conversions = conversions_by_order.get(order_id)
+        conversions_str = ", ".join([str(conv) for conv in conversions]) if conversions else "None"
+
+        for product in sorted(products_by_order[order_id], key=lambda product: product["id"]):
+            catalog_item = product.get("catalogItem", {})
+            sink.write({
+                "Sales Order ID": order_id,
+                "Product ID": product["id"],
+                "Product Name": catalog_item.get("identifier", "Unknown"),
+                "Renewable": renewable_index.get(catalog_item.get("id"), "N/A"),
+                "Conversions": conversions_str
+            })
+
+print(f"{sink.count} sales order products successfully saved to {output_path}")
@@ -1,27 +1,9 @@
-import os
 import pandas as pd
-import requests
-from dotenv import load_dotenv
+from cw_catalog import resolve_catalog_items
+from cw_client import BASE_URL, get_session
 
-# Load environment variables
-load_dotenv()
-
-# Access API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Validate environment variables
-if not all([BASE_URL, AUTH_CODE, CLIENT_ID]):
-    raise EnvironmentError("Missing one or more environment variables")
-
-# API headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json",
-    "Accept": "application/vnd.connectwise.com+json; version=2021.1"
-}
+# Shared keep-alive session with the API version pinned
+session = get_session(accept="application/vnd.connectwise.com+json; version=2021.1")
 
 # Load CSV
 input_file_path = r"c:\users\jmoore\documents\connectwise\Products\InventoryOnHandMWv3.csv"
@@ -36,29 +18,22 @@ if 'Serial' in df.columns:
 else:
     df['Serial'] = ''
 
+# Resolve every distinct product identifier once, in bulk
+catalog_items = resolve_catalog_items(
+    (str(prod_id).strip() for prod_id in df['ProdID']),
+    fields="id,cost,description"
+)
+
 # Function to get cost, product ID, and trimmed description for a given product identifier
 def get_product_cost(prod_id_input):
-    endpoint = f"{BASE_URL}/procurement/catalog"
-    params = {
-        "conditions": f'identifier like "{prod_id_input}%"',
-        "fields": "id,cost,description",
-        "pageSize": 1
-    }
-    response = requests.get(endpoint, headers=headers, params=params)
-
-    if response.status_code == 200:
-        items = response.json()
-        if items:
-            item = items[0]
-            cost = item.get("cost", 0.0)
-            prod_id = item.get("id", None)
-            desc = item.get("description", "")[:49].strip()  # Trim description to 49 characters
-            return cost, prod_id, desc
-        else:
-            print(f"No matching product found for {prod_id_input}")
-            return 0.0, None, ""
+    item = catalog_items.get(prod_id_input)
+    if item:
+        cost = item.get("cost", 0.0)
+        prod_id = item.get("id", None)
+        desc = item.get("description", "")[:49].strip()  # Trim description to 49 characters
+        return cost, prod_id, desc
     else:
-        print(f"Failed to fetch product for {prod_id_input}: {response.status_code} - {response.text}")
+        print(f"No matching product found for {prod_id_input}")
         return 0.0, None, ""
 
 # Build the list of adjustmentDetails
@@ -112,7 +87,7 @@ if adjustment_details:
     }
 
     endpoint = f"{BASE_URL}/procurement/adjustments/173"
-    response = requests.put(endpoint, headers=headers, json=payload)
+    response = session.put(endpoint, json=payload)
 
     if response.status_code == 200:
         print("Successfully submitted bulk adjustment.")
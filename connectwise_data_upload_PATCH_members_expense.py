@@ -1,22 +1,9 @@
-import os
 import pandas as pd
-import requests
-from dotenv import load_dotenv
+from cw_async import DEFAULT_CONCURRENCY, run_rows
+from cw_client import BASE_URL, get_session
 
-# Load environment variables
-load_dotenv()
-
-# Access API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# API headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
+# Shared keep-alive session sized for the number of rows in flight
+session = get_session(pool_size=DEFAULT_CONCURRENCY)
 
 # Input file path
 input_path = r"C:\Users\jmoore\Documents\ConnectWise\company\members_expense_id.csv"
@@ -40,16 +27,23 @@ patch_payload = [
 # Function to update each member
 def update_member(member_id):
     url = f"{BASE_URL}/system/members/{member_id}"
-    response = requests.patch(url, headers=headers, json=patch_payload)
+    response = session.patch(url, json=patch_payload)
     
     if response.status_code == 200:
-        return f"Success: Updated member {member_id}"
+        result = f"Success: Updated member {member_id}"
     else:
-        return f"Error {response.status_code}: {response.text}"
-
-# Process each ID in the CSV file
-results = [update_member(member_id) for member_id in df['id']]
+        result = f"Error {response.status_code}: {response.text}"
+    print(result)
+    return result
 
-# Print results
-for result in results:
+# Function to report a member whose update raised
+def update_error(member_id, e):
+    result = f"Error updating member {member_id}: {e}"
     print(result)
+    return result
+
+# Process each ID in the CSV file concurrently, printing each outcome as it completes
+results = run_rows(df['id'].tolist(), update_member, on_error=update_error)
+
+updated = sum(1 for result in results if result.startswith("Success"))
+print(f"Updated {updated} of {len(results)} members")
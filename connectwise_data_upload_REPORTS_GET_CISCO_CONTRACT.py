@@ -1,133 +1,69 @@
-import os
 import pandas as pd
-import requests
-from dotenv import load_dotenv
+from cw_enrich import fetch_opportunity_details
+from cw_sink import ResultSink
+from cw_mirror import load_entity, open_mirror, sync_entity
 
-# Load environment variables
-load_dotenv()
+# Report window and department for the sales orders
+department_id = 23
+order_date_from = "2025-01-01T00:00:00Z"
+order_date_to = "2025-03-29T00:00:00Z"
 
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# API headers
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
-
-# API endpoint for sales orders
-orders_endpoint = f"{BASE_URL}/sales/orders"
-
-# Parameters for API request (Sales Orders)
-params = {
-    "conditions": "department/id=23 AND orderDate>=[2025-01-01] AND orderDate<=[2025-03-29]",
-    "fields": "id,opportunity/id",
-    "page": 1,
-    "pageSize": 1000  # Adjust based on API limits
-}
+# Bring the local mirror up to date, then select the orders locally
+mirror = open_mirror()
+sync_entity(mirror, "orders")
+orders_df = load_entity(mirror, "orders")
 
 # Initialize list to store sales order data
 sales_orders = []
 
-# Fetch all sales orders, handling pagination
-while True:
-    response = requests.get(orders_endpoint, headers=headers, params=params)
-    
-    if response.status_code == 200:
-        data = response.json()
-        
-        # Append order details to the list
-        for order in data:
-            sales_orders.append({
-                "id": order.get("id"),
-                "opportunity_id": order.get("opportunity", {}).get("id")
-            })
-        
-        # Check if there are more pages
-        if len(data) < params["pageSize"]:
-            break  # No more pages to fetch
-        else:
-            params["page"] += 1  # Increment page number
-    else:
-        print(f"Error {response.status_code}: {response.text}")
-        break
-
-# Convert sales orders to DataFrame
-df_sales_orders = pd.DataFrame(sales_orders)
-
-# Initialize list for enriched sales order data with additional details
-enriched_sales_orders = []
-
-# API endpoints
-opportunity_endpoint = f"{BASE_URL}/sales/opportunities"
-forecast_endpoint = f"{BASE_URL}/sales/opportunities"
-
-# Function to retrieve custom fields, company identifier, and forecast revenue from an opportunity
-def get_opportunity_details(opportunity_id):
-    if not opportunity_id:
-        return None, None, None, None, None  # Return None for all if no opportunity ID
-
-    url = f"{opportunity_endpoint}/{opportunity_id}"
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        opportunity_data = response.json()
-        custom_fields = opportunity_data.get("customFields", [])
-        company_identifier = opportunity_data.get("company", {}).get("name")
-
-        # Extract custom field values and ensure explicit None if missing
-        field_63 = next((cf.get("value") for cf in custom_fields if cf.get("id") == 63), None)
-        
-        # Ensure missing values are explicitly set to None
-        field_63 = None if not field_63 else field_63
-
-        # Retrieve forecast revenue (Order Total)
-        order_total = get_forecast_revenue(opportunity_id)
-
-        return field_63, company_identifier, order_total
-    else:
-        print(f"Error fetching opportunity {opportunity_id}: {response.status_code}")
-        return None, None, None, None, None  # Return None if error occurs
-
-# Function to retrieve forecast revenue (Order Total)
-def get_forecast_revenue(opportunity_id):
-    url = f"{forecast_endpoint}/{opportunity_id}/forecast"
-    response = requests.get(url, headers=headers)
-
-    if response.status_code == 200:
-        forecast_data = response.json()
-        return forecast_data.get("forecastRevenueTotals", {}).get("revenue") or None  # Ensure None if missing
-    else:
-        print(f"Error fetching forecast for opportunity {opportunity_id}: {response.status_code}")
-        return None  # Return None if error occurs
-
-# Iterate over sales orders to enrich with opportunity custom fields, company identifier, and order total
-for order in sales_orders:
-    opp_id = order["opportunity_id"]
-    field_63, company_identifier, order_total = get_opportunity_details(opp_id)
-
-    # Ensure records where all contract fields are None are not included
-    if any([field_63]):  # Only keep if at least one field is not None
-        enriched_sales_orders.append({
-            "order_id": order["id"],
-            "opportunity_id": opp_id,
-            "company_identifier": company_identifier or None,  # Ensure None if missing
-            "AL-Purchasing Contract": field_63,
-            "Order Total": order_total
+if not orders_df.empty:
+    # Compare dates as timestamps, not text, so differently formatted values still order correctly
+    order_dates = pd.to_datetime(orders_df["orderDate"], utc=True, errors="coerce", format="ISO8601")
+    selected = orders_df[
+        (orders_df["department.id"] == department_id)
+        & (order_dates >= pd.Timestamp(order_date_from))
+        & (order_dates <= pd.Timestamp(order_date_to))
+    ]
+    opportunity_ids = selected.get("opportunity.id", pd.Series(index=selected.index, dtype="float64"))
+    for order_id, opportunity_id in zip(selected["id"], opportunity_ids):
+        sales_orders.append({
+            "id": int(order_id),
+            "opportunity_id": None if pd.isna(opportunity_id) else int(opportunity_id)
         })
 
-# Convert enriched data to DataFrame
-df_enriched = pd.DataFrame(enriched_sales_orders)
+# Fetch opportunity details once per distinct opportunity, in bulk
+opportunity_details = fetch_opportunity_details(
+    [order["opportunity_id"] for order in sales_orders],
+    custom_field_ids=[63],
+    only_with_custom_fields=True
+)
 
 # Define output file path
 output_path = r"C:\Users\jmoore\Documents\ConnectWise\SalesOrders\SoContracts.csv"
 
-# Save to CSV only if there are valid records to write
-if not df_enriched.empty:
-    df_enriched.to_csv(output_path, index=False, na_rep="None")  # Ensures None appears in the file
+# Stream enriched rows to the CSV as they are built; None values appear as "None"
+with ResultSink(output_path, na_rep="None") as sink:
+    # Join the opportunity custom fields, company identifier, and order total back onto the orders
+    for order in sales_orders:
+        opp_id = order["opportunity_id"]
+        details = opportunity_details.get(opp_id)
+        if details is None:
+            continue
+
+        field_63 = details["custom_fields"][63]
+
+        # Ensure records where all contract fields are None are not included
+        if any([field_63]):  # Only keep if at least one field is not None
+            sink.write({
+                "order_id": order["id"],
+                "opportunity_id": opp_id,
+                "company_identifier": details["company_identifier"] or None,  # Ensure None if missing
+                "AL-Purchasing Contract": field_63,
+                "Order Total": details["order_total"]
+            })
+
+# The file is only created when there are valid records to write
+if sink.count:
     print(f"Sales orders with opportunity custom fields, company identifier, and Order Total saved to {output_path}")
 else:
     print("No sales order records met the criteria, so no file was generated.")
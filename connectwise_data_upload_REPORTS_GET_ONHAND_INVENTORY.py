@@ -1,86 +1,36 @@
-import os
-import pandas as pd
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Accessing API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": "Basic " + AUTH_CODE,
-    "Content-Type": "application/json"
-}
-
-# File path for output
-output_file_path = r'c:\users\jmoore\documents\connectwise\Products\Product_Inventory_OnHandMW42325.csv'
-
-# Function to get all inventory pages with conditions from a specific warehouse bin
-def get_inventory_from_bin(bin_id):
-    inventory_list = []
-    page = 1
-    while True:
-        params = {
-            "conditions": "(warehouse/id=4) AND onHand>0",
-            "page": page
-        }
-        inventory_url = f"{BASE_URL}/procurement/warehouseBins/{bin_id}/inventoryOnHand"
-        response = requests.get(inventory_url, headers=headers, params=params)
-        
-        if response.status_code != 200:
-            print(f"Failed to retrieve inventory data from bin {bin_id} on page {page}. Status Code: {response.status_code}, Response: {response.text}")
-            break
-        
-        data = response.json()
-        if not data:
-            break
-        
-        for item in data:
-            item_id = item.get("catalogItem", {}).get("id")
-            item_name = item.get("catalogItem", {}).get("identifier")
-            on_hand = item.get("onHand")
-            warehouse_name = item.get("warehouse", {}).get("name")
-            cost = None
-            total_value = None
-            
-            # Fetch cost value for each item
-            if item_id:
-                catalog_url = f"{BASE_URL}/procurement/catalog/{item_id}"
-                catalog_response = requests.get(catalog_url, headers=headers)
-                if catalog_response.status_code == 200:
-                    catalog_data = catalog_response.json()
-                    cost = catalog_data.get("cost")
-                    
-            # Calculate total value
-            if on_hand is not None and cost is not None:
-                total_value = on_hand * cost
-            
-            inventory_list.append({
-                "ID": item_id,
-                "Name": item_name,
-                "On Hand": on_hand,
-                "Cost": cost,
-                "Total Value": total_value,
-                "Warehouse": warehouse_name,
-                "Bin ID": bin_id
-            })
-        
-        page += 1
-    
-    return inventory_list
-
-# Get inventory data only from bin 6
-inventory_bin_6 = get_inventory_from_bin(6)
-
-# Convert list to DataFrame and append to CSV
-df = pd.DataFrame(inventory_bin_6)
-write_header = not os.path.exists(output_file_path) or os.stat(output_file_path).st_size == 0
-df.to_csv(output_file_path, mode='a', header=write_header, index=False)
-
-print(f"Inventory data from bin 5 successfully appended to {output_file_path}")
+import argparse
+from cw_catalog import COST_CACHE_TTL, load_catalog_cost_index
+from cw_inventory import take_inventory_snapshot, write_snapshot
+
+# Default output location
+output_dir = r'c:\users\jmoore\documents\connectwise\Products\inventory_snapshot'
+
+parser = argparse.ArgumentParser(description="Snapshot on-hand inventory across warehouses and bins")
+parser.add_argument("--warehouse", type=int, action="append", dest="warehouse_ids",
+                    help="warehouse ID to include (repeatable, default all)")
+parser.add_argument("--bin", type=int, action="append", dest="bin_ids",
+                    help="warehouse bin ID to include (repeatable, default all)")
+parser.add_argument("--output-dir", default=output_dir, help="directory for the partitioned snapshot")
+parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="snapshot file format")
+parser.add_argument("--workers", type=int, default=8, help="bins pulled at the same time")
+parser.add_argument("--cost-cache", metavar="PATH",
+                    help="reuse the catalog cost scan from this file (default: always scan live)")
+parser.add_argument("--cost-cache-ttl", type=int, default=COST_CACHE_TTL,
+                    help="maximum age of the cost cache in seconds")
+args = parser.parse_args()
+
+# Load id, identifier and cost for the whole catalog once
+catalog = load_catalog_cost_index(cache_path=args.cost_cache, ttl=args.cost_cache_ttl)
+
+# Pull every matching bin in parallel
+snapshot = take_inventory_snapshot(args.warehouse_ids, args.bin_ids, max_workers=args.workers)
+
+# Join the cost from the catalog index and calculate total value
+costs = catalog.drop_duplicates("id").set_index("id")["cost"]
+snapshot["Cost"] = snapshot["ID"].map(costs)
+snapshot["Total Value"] = snapshot["On Hand"] * snapshot["Cost"]
+
+write_snapshot(snapshot, args.output_dir, file_format=args.format)
+
+print(f"Inventory snapshot of {len(snapshot)} rows across {snapshot['Warehouse ID'].nunique()} warehouses "
+      f"written to {args.output_dir}")
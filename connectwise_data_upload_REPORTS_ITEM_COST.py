@@ -1,65 +1,32 @@
-import os
+import argparse
 import pandas as pd
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Access API variables
-BASE_URL = os.getenv("BASE_URL")
-AUTH_CODE = os.getenv("AUTH_CODE")
-CLIENT_ID = os.getenv("CLIENT_ID")
-
-# Validate environment variables
-if not all([BASE_URL, AUTH_CODE, CLIENT_ID]):
-    raise EnvironmentError("Missing one or more environment variables: BASE_URL, AUTH_CODE, CLIENT_ID")
-
-# Set up headers for the API request
-headers = {
-    "ClientId": CLIENT_ID,
-    "Authorization": f"Basic {AUTH_CODE}",
-    "Content-Type": "application/json"
-}
+from cw_catalog import COST_CACHE_TTL, load_catalog_cost_index, normalize_identifier
 
 # File paths
 input_file_path = r'c:\users\jmoore\documents\connectwise\Products\InventoryOnHandSE.csv'
 output_file_path = r'c:\users\jmoore\documents\connectwise\Products\InventoryOnHandSEcost42425.csv'
 
+parser = argparse.ArgumentParser(description="Add the catalog cost to each item of an inventory export")
+parser.add_argument("--cost-cache", metavar="PATH",
+                    help="reuse the catalog cost scan from this file (default: always scan live)")
+parser.add_argument("--cost-cache-ttl", type=int, default=COST_CACHE_TTL,
+                    help="maximum age of the cost cache in seconds")
+args = parser.parse_args()
+
 # Load ProductIDs
 df_input = pd.read_csv(input_file_path)
-product_ids = df_input["id"].dropna().unique()
-
-# API endpoint
-endpoint = f"{BASE_URL}/procurement/catalog"
-
-# Dictionary to store cost per product ID
-cost_lookup = {}
-
-# Loop through ProductIDs and call the API
-for product_id in product_ids:
-    params = {
-        "conditions": f'identifier="{product_id}"',
-        "fields": "identifier,cost",
-        "page": 1,
-        "pageSize": 1
-    }
-
-    response = requests.get(endpoint, headers=headers, params=params)
 
-    if response.status_code != 200:
-        print(f"Error for {product_id}: {response.status_code} - {response.text}")
-        cost_lookup[product_id] = None
-        continue
+# Load the catalog cost index once, from the cache only when --cost-cache is given
+catalog = load_catalog_cost_index(cache_path=args.cost_cache, ttl=args.cost_cache_ttl)
 
-    data = response.json()
-    if isinstance(data, list) and len(data) > 0 and "identifier" in data[0]:
-        cost_lookup[product_id] = data[0].get("cost", None)
-    else:
-        cost_lookup[product_id] = None
+# Identifier to cost, matching identifiers without regard to case
+catalog["match_key"] = catalog["identifier"].astype(str).map(normalize_identifier)
+cost_lookup = catalog.drop_duplicates("match_key").set_index("match_key")["cost"]
 
 # Append the cost column to the original DataFrame
-df_input["cost"] = df_input["id"].map(cost_lookup)
+df_input["cost"] = df_input["id"].map(
+    lambda product_id: None if pd.isna(product_id) else normalize_identifier(product_id)
+).map(cost_lookup)
 
 # Export to CSV with all original columns plus the cost
 df_input.to_csv(output_file_path, index=False)
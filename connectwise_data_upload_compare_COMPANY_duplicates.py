@@ -14,6 +14,17 @@ def write_companies_to_csv(dataframe, file_path):
     except Exception as e:
         print(f"Error writing to file: {e}")
 
+# Columns that identify companies at the same address
+MATCH_COLUMNS = ['address_number', 'parsed_zip']
+
+# Output column order, including the matching_ids column
+COLUMN_ORDER = ["id", "identifier", "name", "address", "address_number", "parsed_zip", "status_name", "deletedFlag", "matching_ids"]
+
+def format_matching_ids(own_id, group_ids):
+    """Join the IDs in a company's group, other than its own, as a comma-separated string."""
+    matching_ids = ', '.join(group_id for group_id in group_ids if group_id != own_id)
+    return matching_ids or None
+
 def process_company_data(dataframe):
     """Process company data and find matching address_number and parsed_zip for each company."""
     
@@ -21,35 +32,61 @@ def process_company_data(dataframe):
     if 'address_number' not in dataframe.columns or 'parsed_zip' not in dataframe.columns:
         raise ValueError("'address_number' or 'parsed_zip' column not found in the dataset.")
     
-    # Create a column to store the list of matched IDs for each row
+    dataframe = dataframe.reset_index(drop=True)
     dataframe['matching_ids'] = None
-    
-    # Iterate over each row and compare its 'address_number' and 'parsed_zip' with all other rows
-    for idx, company in dataframe.iterrows():
-        # Get the address_number and parsed_zip for the current company
-        address_number = company['address_number']
-        parsed_zip = company['parsed_zip']
-        current_id = company['id']
-        
-        # Find other companies with the same address_number and parsed_zip
-        matching_companies = dataframe[(dataframe['address_number'] == address_number) & 
-                                       (dataframe['parsed_zip'] == parsed_zip) & 
-                                       (dataframe['id'] != current_id)]
-        
-        if not matching_companies.empty:
-            # Store the matching IDs as a comma-separated string with spaces between values
-            matching_ids = ', '.join(matching_companies['id'].astype(str).tolist())
-            dataframe.at[idx, 'matching_ids'] = matching_ids
+
+    # Rows with a blank address_number or parsed_zip never match anything
+    candidates = dataframe[dataframe[MATCH_COLUMNS].notna().all(axis=1)]
+
+    # Keep only rows that share their address_number and parsed_zip with another row
+    group_size = candidates.groupby(MATCH_COLUMNS, sort=False)['id'].transform('size')
+    duplicates = candidates[group_size > 1]
+
+    if not duplicates.empty:
+        # Collect each group's IDs once, then give every row its group minus itself
+        id_strings = duplicates['id'].astype(str)
+        group_ids = id_strings.groupby([duplicates[column] for column in MATCH_COLUMNS], sort=False).agg(list)
+        row_groups = duplicates.join(group_ids.rename('group_ids'), on=MATCH_COLUMNS)['group_ids']
+        dataframe.loc[duplicates.index, 'matching_ids'] = [
+            format_matching_ids(own_id, ids) for own_id, ids in zip(id_strings, row_groups)
+        ]
     
     # Order columns as specified, including the matching_ids column
-    column_order = ["id", "identifier", "name", "address", "address_number", "parsed_zip", "status_name", "deletedFlag", "matching_ids"]
-    dataframe = dataframe.reindex(columns=column_order)
-    
-    return dataframe
+    return dataframe.reindex(columns=COLUMN_ORDER)
+
+def process_company_file_streaming(input_file_path, output_file_path, chunksize=100000):
+    """Find matching companies for inputs larger than memory, reading the CSV in chunks.
+
+    The first pass keeps only the IDs per address_number/parsed_zip group; the
+    second pass re-reads the file and writes each chunk with its matching_ids.
+    """
+    key_dtypes = {column: str for column in MATCH_COLUMNS}
+
+    # First pass: group IDs by address_number and parsed_zip
+    groups = {}
+    for chunk in pd.read_csv(input_file_path, usecols=['id'] + MATCH_COLUMNS, dtype=key_dtypes, chunksize=chunksize):
+        chunk = chunk.dropna(subset=MATCH_COLUMNS)
+        for company_id, address_number, parsed_zip in zip(chunk['id'].astype(str), chunk['address_number'], chunk['parsed_zip']):
+            groups.setdefault((address_number, parsed_zip), []).append(company_id)
 
-def upload_and_process_csv(input_file_path, output_file_path):
+    # Only shared addresses are needed in the second pass
+    groups = {key: ids for key, ids in groups.items() if len(ids) > 1}
+
+    # Second pass: attach matching_ids and append each chunk to the output
+    for chunk in pd.read_csv(input_file_path, dtype=key_dtypes, chunksize=chunksize):
+        chunk['matching_ids'] = [
+            format_matching_ids(own_id, groups.get((address_number, parsed_zip), ()))
+            for own_id, address_number, parsed_zip in zip(chunk['id'].astype(str), chunk['address_number'], chunk['parsed_zip'])
+        ]
+        write_companies_to_csv(chunk.reindex(columns=COLUMN_ORDER), output_file_path)
+
+def upload_and_process_csv(input_file_path, output_file_path, streaming=False):
     """Upload a CSV file, process the data, and save the result to another CSV file."""
     try:
+        if streaming:
+            process_company_file_streaming(input_file_path, output_file_path)
+            return
+
         # Load the company data from CSV file
         companies_df = pd.read_csv(input_file_path)
         print(f"Loaded data from '{input_file_path}'.")
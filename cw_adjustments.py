@@ -0,0 +1,123 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from urllib3.exceptions import NewConnectionError
+from cw_client import BASE_URL, get_session
+from cw_ratelimit import backoff_delay
+
+# Detail lines posted at the same time
+DEFAULT_MAX_WORKERS = 8
+
+# Retries per detail line when the connection is refused
+DEFAULT_DETAIL_RETRIES = 3
+
+
+def create_adjustment_header(header, base_url=BASE_URL, session=None):
+    """
+    Create an inventory adjustment without any detail lines.
+
+    Args:
+        header (dict): The adjustment payload; adjustmentDetails is ignored.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        int or None: The new adjustment ID, or None if creation failed.
+    """
+    session = session or get_session()
+    payload = {key: value for key, value in header.items() if key != "adjustmentDetails"}
+    response = session.post(f"{base_url}/procurement/adjustments", json=payload)
+    if response.status_code in (200, 201):
+        return response.json().get("id")
+    print(f"Failed to create adjustment {payload.get('identifier')}: {response.status_code} - {response.text}")
+    return None
+
+
+def connection_refused(error):
+    """
+    Tell whether a request failed before it reached the server.
+
+    Args:
+        error (requests.ConnectionError): The error raised by the request.
+
+    Returns:
+        bool: True if no connection was made, so the request was never sent.
+    """
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def post_adjustment_detail(adjustment_id, detail, base_url=BASE_URL, max_retries=DEFAULT_DETAIL_RETRIES,
+                           session=None):
+    """
+    Add one detail line to an adjustment.
+
+    The POST is not idempotent, so it is only resent when the connection
+    was refused; a 429 is already retried by the throttled session. Any
+    other error is reported as failed rather than risking a duplicate line.
+
+    Args:
+        adjustment_id (int): The adjustment ID.
+        detail (dict): The detail line payload.
+        base_url (str): The base URL of the API.
+        max_retries (int): Retries after a refused connection.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        dict: {"status", "status_code", "error"} for the line.
+    """
+    session = session or get_session()
+    endpoint = f"{base_url}/procurement/adjustments/{adjustment_id}/details"
+    payload = dict(detail, adjustment={"id": adjustment_id})
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = session.post(endpoint, json=payload)
+            break
+        except requests.ConnectionError as e:
+            if not connection_refused(e) or attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+
+    if response.status_code in (200, 201):
+        return {"status": "Success", "status_code": response.status_code, "error": ""}
+    return {"status": "Failed", "status_code": response.status_code, "error": response.text}
+
+
+def submit_adjustment(header, details, base_url=BASE_URL, max_workers=DEFAULT_MAX_WORKERS,
+                      max_retries=DEFAULT_DETAIL_RETRIES, session=None):
+    """
+    Create an adjustment once, then add its detail lines concurrently.
+
+    A failed line is reported on its own, instead of failing the whole
+    load as one large request would.
+
+    Args:
+        header (dict): The adjustment payload (identifier, type, reason, ...).
+        details (list): The detail line payloads.
+        base_url (str): The base URL of the API.
+        max_workers (int): Maximum number of detail lines in flight.
+        max_retries (int): Retries per detail line after a refused connection.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        tuple: (adjustment ID or None, list of per-line results in input order).
+    """
+    session = session or get_session()
+    adjustment_id = create_adjustment_header(header, base_url=base_url, session=session)
+    if adjustment_id is None:
+        return None, []
+
+    def post_detail(detail):
+        try:
+            return post_adjustment_detail(adjustment_id, detail, base_url=base_url,
+                                          max_retries=max_retries, session=session)
+        except Exception as e:
+            return {"status": "Failed", "status_code": None, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(post_detail, details))
+
+    failed = sum(1 for result in results if result["status"] != "Success")
+    print(f"Adjustment {adjustment_id}: {len(results) - failed} of {len(results)} detail lines added, {failed} failed")
+    return adjustment_id, results
@@ -0,0 +1,59 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of rows in flight at the same time
+DEFAULT_CONCURRENCY = int(os.getenv("CW_CONCURRENCY", "8"))
+
+
+async def run_rows_async(rows, worker, concurrency=DEFAULT_CONCURRENCY, on_error=None):
+    """
+    Run worker over every row with at most `concurrency` rows in flight.
+
+    The worker is an ordinary blocking function (it uses the shared pooled
+    session) and runs on a thread pool of `concurrency` threads, so existing
+    per-row code plugs in unchanged. Size the session pool to at least
+    `concurrency`.
+
+    Args:
+        rows (iterable): The input rows, e.g. df.to_dict("records").
+        worker (callable): Function taking one row and returning its result row.
+        concurrency (int): Maximum number of rows processed at once.
+        on_error (callable): Optional function (row, exception) returning the
+            result row for a worker that raised. Exceptions propagate if unset.
+
+    Returns:
+        list: One result per input row, in input order.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # asyncio's default executor caps its threads at min(32, cpu + 4), so use a pool of our own
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def run_one(row):
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(executor, worker, row)
+                except Exception as e:
+                    if on_error is None:
+                        raise
+                    return on_error(row, e)
+
+        return await asyncio.gather(*(run_one(row) for row in rows))
+
+
+def run_rows(rows, worker, concurrency=DEFAULT_CONCURRENCY, on_error=None):
+    """
+    Blocking entry point for run_rows_async, for use from plain scripts.
+
+    Args:
+        rows (iterable): The input rows, e.g. df.to_dict("records").
+        worker (callable): Function taking one row and returning its result row.
+        concurrency (int): Maximum number of rows processed at once.
+        on_error (callable): Optional function (row, exception) returning the
+            result row for a worker that raised.
+
+    Returns:
+        list: One result per input row, in input order.
+    """
+    return asyncio.run(run_rows_async(rows, worker, concurrency=concurrency, on_error=on_error))
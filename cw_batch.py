@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+from cw_client import get_session
+from cw_paging import DEFAULT_MAX_WORKERS, MAX_PAGE_SIZE, fetch_all_pages, fetch_page
+
+# IDs per `in (...)` condition; keeps the query string well under URL limits
+DEFAULT_CHUNK_SIZE = 100
+
+
+def unique_values(values):
+    """
+    De-duplicate values, dropping blanks and keeping first-seen order.
+
+    Args:
+        values (iterable): The raw values.
+
+    Returns:
+        list: The distinct non-blank values.
+    """
+    seen = {}
+    for value in values:
+        if value is None or value == "" or value != value:  # value != value catches NaN
+            continue
+        seen.setdefault(value, None)
+    return list(seen)
+
+
+def chunked(values, size=DEFAULT_CHUNK_SIZE):
+    """
+    Split a list into consecutive chunks of at most size items.
+
+    Args:
+        values (list): The values to split.
+        size (int): Maximum chunk length.
+
+    Returns:
+        list: The chunks.
+    """
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+def format_condition_value(value):
+    """
+    Format a value for a ConnectWise condition: numbers bare, text quoted.
+
+    Args:
+        value (int or str): The value.
+
+    Returns:
+        str: The condition literal.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(int(value))
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def in_condition(field, values):
+    """
+    Build a `field in (...)` condition.
+
+    Args:
+        field (str): The condition field, e.g. "id" or "salesOrder/id".
+        values (list): The values to match.
+
+    Returns:
+        str: The condition string.
+    """
+    return f"{field} in ({','.join(format_condition_value(value) for value in values)})"
+
+
+def fetch_by_ids(url, ids, field="id", fields=None, conditions=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_workers=DEFAULT_MAX_WORKERS, one_per_value=None, child_conditions=None, session=None):
+    """
+    Fetch the records matching many IDs with chunked `in (...)` queries.
+
+    Args:
+        url (str): The list endpoint URL.
+        ids (iterable): The values to match; duplicates and blanks are dropped.
+        field (str): The condition field the values are matched against.
+        fields (str): Optional fields projection.
+        conditions (str): Optional extra condition ANDed to every chunk.
+        chunk_size (int): Values per query.
+        max_workers (int): Maximum number of chunks in flight.
+        one_per_value (bool): At most one record matches each value, so a
+            chunk fits in a single page. Defaults to True for field "id".
+        child_conditions (str): Optional childConditions for every chunk.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: The matching records, chunk by chunk.
+
+    Raises:
+        requests.HTTPError: If any chunk request fails.
+    """
+    session = session or get_session()
+    if one_per_value is None:
+        one_per_value = field == "id"
+
+    def fetch_chunk(chunk):
+        condition = in_condition(field, chunk)
+        params = {"conditions": f"({conditions}) AND {condition}" if conditions else condition}
+        if fields:
+            params["fields"] = fields
+        if child_conditions:
+            params["childConditions"] = child_conditions
+        if one_per_value and len(chunk) <= MAX_PAGE_SIZE:
+            return fetch_page(url, params, 1, MAX_PAGE_SIZE, session=session)
+        return fetch_all_pages(url, params, session=session)
+
+    records = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for data in executor.map(fetch_chunk, chunked(unique_values(ids), chunk_size)):
+            records.extend(data)
+    return records
+
+
+def fetch_each(url_template, ids, params=None, max_workers=DEFAULT_MAX_WORKERS, session=None):
+    """
+    GET one resource per distinct ID concurrently, for endpoints with no bulk form.
+
+    Args:
+        url_template (str): URL with an {id} placeholder.
+        ids (iterable): The IDs; duplicates and blanks are dropped.
+        params (dict): Optional query parameters for every request.
+        max_workers (int): Maximum number of requests in flight.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        dict: ID to parsed JSON response, or None where the request failed.
+    """
+    session = session or get_session()
+
+    def fetch_one(resource_id):
+        response = session.get(url_template.format(id=resource_id), params=params)
+        if response.status_code == 200:
+            return response.json()
+        print(f"Failed to fetch {url_template.format(id=resource_id)}. Status Code: {response.status_code}")
+        return None
+
+    distinct_ids = unique_values(ids)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(distinct_ids, executor.map(fetch_one, distinct_ids)))
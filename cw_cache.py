@@ -0,0 +1,68 @@
+import json
+import os
+import time
+
+# Default time-to-live for on-disk caches, in seconds
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def format_age(seconds):
+    """
+    Describe an age in seconds as minutes or hours, e.g. "42 minutes".
+
+    Args:
+        seconds (float): The age.
+
+    Returns:
+        str: The readable age.
+    """
+    minutes = int(seconds // 60)
+    if minutes < 120:
+        return f"{minutes} minutes"
+    return f"{minutes // 60} hours"
+
+
+def load_cache(path, ttl=DEFAULT_TTL):
+    """
+    Load data saved by save_cache if the file exists and has not expired.
+
+    Args:
+        path (str): Path of the cache file.
+        ttl (int): Maximum age in seconds, or None to never expire.
+
+    Returns:
+        object or None: The cached data, or None if missing or stale.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as cache_file:
+            cached = json.load(cache_file)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache file {path}: {e}")
+        return None
+
+    age = time.time() - cached.get("saved_at", 0)
+    if ttl is not None and age > ttl:
+        return None
+    print(f"Using cached data from {path}, saved {format_age(age)} ago")
+    return cached.get("data")
+
+
+def save_cache(path, data):
+    """
+    Save JSON-serializable data with a timestamp for load_cache.
+
+    Args:
+        path (str): Path of the cache file.
+        data (object): JSON-serializable data to store.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as cache_file:
+        json.dump({"saved_at": time.time(), "data": data}, cache_file)
+    os.replace(temp_path, path)
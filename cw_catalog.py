@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from cw_batch import fetch_by_ids, unique_values
+from cw_cache import DEFAULT_TTL, load_cache, save_cache
+from cw_client import BASE_URL, get_session
+from cw_paging import DEFAULT_MAX_WORKERS, fetch_all_pages
+
+# Columns of the catalog cost index
+COST_INDEX_FIELDS = "id,identifier,cost"
+
+
+def normalize_identifier(identifier):
+    """
+    Normalize a catalog identifier for matching; conditions ignore case.
+
+    Args:
+        identifier (str): The identifier.
+
+    Returns:
+        str: The stripped, case-folded identifier.
+    """
+    return str(identifier).strip().casefold()
+
+
+def resolve_catalog_items(identifiers, fields="id,identifier", base_url=BASE_URL,
+                          max_workers=DEFAULT_MAX_WORKERS, session=None):
+    """
+    Resolve catalog identifiers to catalog items in bulk.
+
+    Distinct identifiers are matched exactly with chunked `identifier in (...)`
+    queries. Identifiers with no exact match fall back to the old
+    `identifier like "value%"` query, taking its first result.
+
+    Args:
+        identifiers (iterable): Identifiers; duplicates and blanks are dropped.
+        fields (str): Fields projection; id and identifier are always included.
+        base_url (str): The base URL of the API.
+        max_workers (int): Maximum number of requests in flight.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        dict: Identifier (as given) to its catalog item, or None if not found.
+    """
+    session = session or get_session()
+    endpoint = f"{base_url}/procurement/catalog"
+    field_list = unique_values(["id", "identifier"] + fields.split(","))
+    fields = ",".join(field_list)
+
+    identifiers = unique_values(str(identifier).strip() for identifier in identifiers)
+
+    # Exact matches, in chunks
+    exact = {}
+    for item in fetch_by_ids(endpoint, identifiers, field="identifier", fields=fields,
+                             one_per_value=True, session=session):
+        exact.setdefault(normalize_identifier(item.get("identifier", "")), item)
+
+    resolved = {identifier: exact.get(normalize_identifier(identifier)) for identifier in identifiers}
+
+    # Prefix fallback for the rare misses
+    def prefix_lookup(identifier):
+        params = {"conditions": f'identifier like "{identifier}%"', "fields": fields, "pageSize": 1}
+        response = session.get(endpoint, params=params)
+        if response.status_code != 200:
+            print(f"Failed to fetch product for {identifier}: {response.status_code} - {response.text}")
+            return None
+        items = response.json()
+        return items[0] if items else None
+
+    misses = [identifier for identifier, item in resolved.items() if item is None]
+    if misses:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            resolved.update(zip(misses, executor.map(prefix_lookup, misses)))
+
+    found = sum(1 for item in resolved.values() if item is not None)
+    print(f"Resolved {found} of {len(identifiers)} catalog identifiers ({len(misses)} by prefix fallback)")
+    return resolved
+
+
+# Maximum age of a cost index cache; costs change during the day
+COST_CACHE_TTL = 60 * 60
+
+
+def load_catalog_cost_index(cache_path=None, ttl=COST_CACHE_TTL, base_url=BASE_URL, session=None):
+    """
+    Load id, identifier and cost for the whole catalog in one paged scan.
+
+    Args:
+        cache_path (str): Optional JSON file that keeps the scan between runs.
+        ttl (int): Maximum age of the cache file in seconds.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        pandas.DataFrame: Columns id, identifier and cost, one row per item.
+    """
+    records = load_cache(cache_path, ttl)
+    if records is None:
+        records = fetch_all_pages(f"{base_url}/procurement/catalog", {"fields": COST_INDEX_FIELDS},
+                                  session=session or get_session())
+        if cache_path:
+            save_cache(cache_path, records)
+
+    return pd.DataFrame.from_records(records, columns=COST_INDEX_FIELDS.split(","))
+
+
+def load_catalog_custom_field_index(custom_field_id, cache_path=None, ttl=DEFAULT_TTL, base_url=BASE_URL,
+                                    session=None):
+    """
+    Load one catalog custom field for the whole catalog in one paged scan.
+
+    Args:
+        custom_field_id (int): The custom field ID.
+        cache_path (str): Optional JSON file that keeps the scan between runs.
+        ttl (int): Maximum age of the cache file in seconds.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        dict: Catalog item ID to the field's value; items without the field are left out.
+    """
+    records = load_cache(cache_path, ttl)
+    if records is None:
+        items = fetch_all_pages(f"{base_url}/procurement/catalog", {"fields": "id,customFields"},
+                                session=session or get_session())
+        records = []
+        for item in items:
+            for field in item.get("customFields", []):
+                if field.get("id") == custom_field_id:
+                    records.append({"id": item["id"], "value": field.get("value")})
+                    break
+        if cache_path:
+            save_cache(cache_path, records)
+
+    return {record["id"]: record["value"] for record in records}
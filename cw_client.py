@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from cw_ratelimit import RateLimiter, backoff_delay, parse_retry_after
+
+# Load environment variables
+load_dotenv()
+
+# Accessing API variables
+BASE_URL = os.getenv("BASE_URL")
+AUTH_CODE = os.getenv("AUTH_CODE")
+CLIENT_ID = os.getenv("CLIENT_ID")
+
+# Default Accept header used when a script does not pin an API version
+DEFAULT_ACCEPT = "application/json"
+
+# Number of keep-alive connections kept open to the ConnectWise host
+DEFAULT_POOL_SIZE = int(os.getenv("CW_POOL_SIZE", "10"))
+
+# Retries for throttled or unavailable responses before giving up
+MAX_RETRIES = int(os.getenv("CW_MAX_RETRIES", "5"))
+
+# Methods that are safe to resend after a 503 or a dropped connection
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+_session = None
+
+
+class ThrottledSession(requests.Session):
+    """
+    Session that paces requests through a RateLimiter and retries throttling.
+
+    A 429 is retried for every method because ConnectWise rejected the
+    request without applying it; pass retry_throttled_writes=False for
+    APIs where that is not guaranteed. A 503 or a connection error is only
+    retried for idempotent methods. Retries honour Retry-After and fall
+    back to jittered exponential backoff.
+    """
+
+    def __init__(self, limiter=None, max_retries=MAX_RETRIES, retry_throttled_writes=True):
+        super().__init__()
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.retry_throttled_writes = retry_throttled_writes
+
+    def request(self, method, url, *args, **kwargs):
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+
+        while True:
+            self.limiter.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code not in (429, 503):
+                self.limiter.on_success()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.limiter.on_throttle(retry_after)
+            retryable = idempotent or (response.status_code == 429 and self.retry_throttled_writes)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            print(f"Throttled ({response.status_code}) on {method} {url}, retry {attempt + 1} of {self.max_retries}")
+            response.close()
+            if retry_after is None:
+                time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+
+def build_headers(accept=DEFAULT_ACCEPT, content_type="application/json"):
+    """
+    Build the ConnectWise request headers from BASE_URL/AUTH_CODE/CLIENT_ID.
+
+    Args:
+        accept (str): Value for the Accept header (API version pin).
+        content_type (str): Value for the Content-Type header.
+
+    Returns:
+        dict: Headers for the API request.
+    """
+    if not BASE_URL or not AUTH_CODE or not CLIENT_ID:
+        sys.exit("Missing required environment variables. Please check your .env file.")
+
+    return {
+        "ClientId": CLIENT_ID,
+        "Authorization": "Basic " + AUTH_CODE,
+        "Content-Type": content_type,
+        "Accept": accept,
+        "Accept-Encoding": "gzip, deflate"
+    }
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, accept=DEFAULT_ACCEPT, headers=None, limiter=None,
+                   retry_throttled_writes=True):
+    """
+    Create a new keep-alive, rate-limited session with a sized connection pool.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host.
+        accept (str): Value for the Accept header (API version pin).
+        headers (dict): Request headers; defaults to the ConnectWise Manage headers.
+        limiter (RateLimiter): Pacing for the session; defaults to the Manage rate.
+        retry_throttled_writes (bool): Retry a 429 on POST/PATCH as well as on idempotent methods.
+
+    Returns:
+        ThrottledSession: Session with the headers applied.
+    """
+    session = ThrottledSession(limiter=limiter, retry_throttled_writes=retry_throttled_writes)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers if headers is not None else build_headers(accept=accept))
+    return session
+
+
+def get_session(pool_size=DEFAULT_POOL_SIZE, accept=DEFAULT_ACCEPT):
+    """
+    Return the shared session, creating it on first use.
+
+    The first caller decides the pool size and Accept header; later calls
+    reuse the same connections.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host.
+        accept (str): Value for the Accept header (API version pin).
+
+    Returns:
+        ThrottledSession: The shared session.
+    """
+    global _session
+    if _session is None:
+        _session = create_session(pool_size=pool_size, accept=accept)
+    return _session
@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+from cw_batch import fetch_by_ids, unique_values
+from cw_client import BASE_URL, get_session
+from cw_paging import DEFAULT_MAX_WORKERS
+
+
+def normalize_company_id(company_id):
+    """
+    Convert a company ID read from a CSV (int, float or text) to an int.
+
+    Args:
+        company_id: The raw company ID.
+
+    Returns:
+        int or None: The company ID, or None if it is blank or not a number.
+    """
+    try:
+        return int(float(company_id))
+    except (TypeError, ValueError):
+        return None
+
+
+class CompanyContactCache:
+    """
+    Default contact per company, prefetched in chunked `company/id in (...)` queries.
+
+    The default contact is the company's first contact in id order, the
+    same one a `company/id = X` query returns first. The choice made for
+    each company is kept in chosen (None when it has no contacts).
+    """
+
+    def __init__(self, base_url=BASE_URL, session=None):
+        self.base_url = base_url
+        self.session = session or get_session()
+        self.chosen = {}
+
+    def prefetch(self, company_ids):
+        """
+        Load the default contact of every company not loaded yet.
+
+        Args:
+            company_ids (iterable): Company IDs; duplicates and blanks are dropped.
+        """
+        missing = [company_id for company_id in unique_values(map(normalize_company_id, company_ids))
+                   if company_id not in self.chosen]
+        if not missing:
+            return
+
+        contacts = fetch_by_ids(f"{self.base_url}/company/contacts", missing, field="company/id",
+                                fields="id,company/id", one_per_value=False, session=self.session)
+        for company_id in missing:
+            self.chosen[company_id] = None
+        for contact in sorted(contacts, key=lambda contact: contact["id"]):
+            company_id = contact.get("company", {}).get("id")
+            if company_id in self.chosen and self.chosen[company_id] is None:
+                self.chosen[company_id] = contact["id"]
+
+        without_contacts = sum(1 for company_id in missing if self.chosen[company_id] is None)
+        print(f"Loaded default contacts for {len(missing)} companies ({without_contacts} without contacts)")
+
+    def contact_id(self, company_id):
+        """
+        Return the default contact ID of a company, loading it if needed.
+
+        Args:
+            company_id: The company ID.
+
+        Returns:
+            int or None: The contact ID, or None if the company has no contacts.
+        """
+        company_id = normalize_company_id(company_id)
+        if company_id is None:
+            return None
+        if company_id not in self.chosen:
+            self.prefetch([company_id])
+        return self.chosen[company_id]
+
+
+def plan_default_contacts(company_ids, contact_type_id, base_url=BASE_URL, session=None):
+    """
+    Work out which companies need their default contact changed to a contact of a type.
+
+    Companies and their contacts of the type are fetched in chunked
+    `id in (...)` / `company/id in (...)` queries. The target is the last
+    such contact in id order, the one the old per-contact PATCH loop left
+    as the default.
+
+    Args:
+        company_ids (iterable): Company IDs; duplicates and blanks are dropped.
+        contact_type_id (int): The contact type, e.g. 16.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: One dict per company with CW_ID, Company_Name, Contact_ID,
+            Current_Contact_ID and Action ("Update", "Already default",
+            "No matching contact" or "Company not found").
+    """
+    session = session or get_session()
+    company_ids = unique_values(map(normalize_company_id, company_ids))
+
+    companies = {
+        company["id"]: company
+        for company in fetch_by_ids(f"{base_url}/company/companies", company_ids,
+                                    fields="id,name,defaultContact/id", session=session)
+    }
+    contacts = fetch_by_ids(f"{base_url}/company/contacts", company_ids, field="company/id",
+                            fields="id,company/id", one_per_value=False,
+                            child_conditions=f"types/id={contact_type_id}", session=session)
+
+    targets = {}
+    for contact in sorted(contacts, key=lambda contact: contact["id"]):
+        targets[contact.get("company", {}).get("id")] = contact["id"]
+
+    plan = []
+    for company_id in company_ids:
+        company = companies.get(company_id)
+        current = ((company or {}).get("defaultContact") or {}).get("id")
+        target = targets.get(company_id)
+        if company is None:
+            action = "Company not found"
+        elif target is None:
+            action = "No matching contact"
+        elif current == target:
+            action = "Already default"
+        else:
+            action = "Update"
+        plan.append({
+            "CW_ID": company_id,
+            "Company_Name": (company or {}).get("name"),
+            "Contact_ID": target,
+            "Current_Contact_ID": current,
+            "Action": action
+        })
+    return plan
+
+
+def apply_default_contacts(plan, base_url=BASE_URL, max_workers=DEFAULT_MAX_WORKERS, session=None):
+    """
+    PATCH defaultContact concurrently for the plan entries whose Action is "Update".
+
+    Args:
+        plan (list): The result of plan_default_contacts; entries are updated in place.
+        base_url (str): The base URL of the API.
+        max_workers (int): Maximum number of PATCHes in flight.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: The plan, with Action set to "Updated" or "Failed: <status>" for the patched entries.
+    """
+    session = session or get_session()
+
+    def patch(entry):
+        patch_data = [{"op": "replace", "path": "/defaultContact", "value": {"id": entry["Contact_ID"]}}]
+        try:
+            response = session.patch(f"{base_url}/company/companies/{entry['CW_ID']}", json=patch_data)
+        except Exception as e:
+            print(f"Failed to update default contact for CW_ID {entry['CW_ID']}: {e}")
+            return "Failed: error"
+        if response.status_code == 200:
+            print(f"Default contact updated for CW_ID {entry['CW_ID']} with Contact_ID {entry['Contact_ID']}")
+            return "Updated"
+        print(f"Failed to update default contact for CW_ID {entry['CW_ID']}: {response.text}")
+        return f"Failed: {response.status_code}"
+
+    updates = [entry for entry in plan if entry["Action"] == "Update"]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for entry, action in zip(updates, executor.map(patch, updates)):
+            entry["Action"] = action
+    return plan
@@ -0,0 +1,50 @@
+from cw_batch import fetch_by_ids, fetch_each, unique_values
+from cw_client import BASE_URL, get_session
+
+
+def fetch_opportunity_details(opportunity_ids, custom_field_ids, only_with_custom_fields=False,
+                              base_url=BASE_URL, session=None):
+    """
+    Fetch company, custom field values and forecast revenue for opportunities.
+
+    Opportunities are read in chunked `id in (...)` queries, then forecasts
+    are fetched concurrently, once per distinct opportunity kept.
+
+    Args:
+        opportunity_ids (iterable): Opportunity IDs; duplicates and blanks are dropped.
+        custom_field_ids (list): IDs of the custom fields to extract.
+        only_with_custom_fields (bool): Skip the forecast (and the result) for
+            opportunities where every requested custom field is blank.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        dict: Opportunity ID to {"company_identifier", "custom_fields", "order_total"}.
+    """
+    session = session or get_session()
+    opportunity_ids = unique_values(opportunity_ids)
+
+    opportunities = fetch_by_ids(
+        f"{base_url}/sales/opportunities",
+        opportunity_ids,
+        fields="id,company/name,customFields",
+        session=session
+    )
+
+    details = {}
+    for opportunity in opportunities:
+        values = {cf.get("id"): cf.get("value") for cf in opportunity.get("customFields", [])}
+        # Blank custom field values are reported as None
+        custom_fields = {field_id: values.get(field_id) or None for field_id in custom_field_ids}
+        if only_with_custom_fields and not any(custom_fields.values()):
+            continue
+        details[opportunity["id"]] = {
+            "company_identifier": opportunity.get("company", {}).get("name"),
+            "custom_fields": custom_fields,
+            "order_total": None
+        }
+
+    forecasts = fetch_each(f"{base_url}/sales/opportunities/{{id}}/forecast", list(details), session=session)
+    for opportunity_id, forecast in forecasts.items():
+        details[opportunity_id]["order_total"] = (forecast or {}).get("forecastRevenueTotals", {}).get("revenue") or None
+    return details
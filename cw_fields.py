@@ -0,0 +1,186 @@
+import atexit
+import os
+import threading
+from cw_client import get_session
+
+# Declared field projections, keyed by call site
+FIELD_PROJECTIONS = {
+    "companies_names_get.company_status": "name,status/name,deletedFlag",
+    "product_vendor_patch.verify_update": "id,subcategory/id",
+}
+
+# Log which response keys each call site actually reads
+FIELDS_DEBUG = os.getenv("CW_FIELDS_DEBUG", "").lower() in ("1", "true", "yes")
+
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+def projected_params(call_site, params=None):
+    """
+    Add the declared fields projection of a call site to its query parameters.
+
+    A fields value already present in params wins over the declaration.
+
+    Args:
+        call_site (str): Name of the call site in FIELD_PROJECTIONS.
+        params (dict): Query parameters of the call.
+
+    Returns:
+        dict: The parameters to send.
+    """
+    params = dict(params or {})
+    fields = FIELD_PROJECTIONS.get(call_site)
+    if fields and "fields" not in params:
+        params["fields"] = fields
+    return params
+
+
+def leaf_paths(data, prefix=""):
+    """
+    List the key paths of a response in fields syntax, e.g. "status/name".
+
+    Args:
+        data: A decoded JSON value.
+        prefix (str): Path of data within the response.
+
+    Returns:
+        set: The paths of all leaf values.
+    """
+    paths = set()
+    if isinstance(data, dict):
+        for key, value in data.items():
+            path = f"{prefix}{key}"
+            nested = leaf_paths(value, path + "/")
+            paths.update(nested or {path})
+    elif isinstance(data, list):
+        for item in data:
+            paths.update(leaf_paths(item, prefix))
+    return paths
+
+
+def _record_read(call_site, path):
+    with _usage_lock:
+        _usage[call_site]["read"].add(path)
+
+
+def _track(call_site, value, path):
+    if isinstance(value, dict):
+        return TrackedDict(call_site, value, path)
+    if isinstance(value, list):
+        return [_track(call_site, item, path) for item in value]
+    return value
+
+
+class TrackedDict(dict):
+    """
+    Dict that records the response keys read through it for FIELDS_DEBUG.
+
+    Reads through [], get() and `in` record one key; iterating the dict
+    records all of its keys. Nested dicts are tracked the same way.
+    """
+
+    def __init__(self, call_site, data, path=""):
+        super().__init__((key, _track(call_site, value, f"{path}{key}/")) for key, value in data.items())
+        self.call_site = call_site
+        self.path = path
+
+    def _read(self, key):
+        value = dict.get(self, key)
+        if not isinstance(value, (TrackedDict, list)) or not value:
+            _record_read(self.call_site, f"{self.path}{key}")
+
+    def __getitem__(self, key):
+        self._read(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._read(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self._read(key)
+        return super().__contains__(key)
+
+    def _read_all(self):
+        for key in dict.keys(self):
+            self._read(key)
+
+    def __iter__(self):
+        self._read_all()
+        return super().__iter__()
+
+    def keys(self):
+        self._read_all()
+        return super().keys()
+
+    def values(self):
+        self._read_all()
+        return super().values()
+
+    def items(self):
+        self._read_all()
+        return super().items()
+
+
+def track_reads(call_site, data):
+    """
+    Wrap a decoded response so the keys read from it are logged.
+
+    Does nothing unless FIELDS_DEBUG is on.
+
+    Args:
+        call_site (str): Name of the call site.
+        data: The decoded JSON response.
+
+    Returns:
+        The response, wrapped in TrackedDicts when debugging.
+    """
+    if not FIELDS_DEBUG:
+        return data
+    with _usage_lock:
+        usage = _usage.setdefault(call_site, {"fetched": set(), "read": set()})
+        usage["fetched"].update(leaf_paths(data))
+    return _track(call_site, data, "")
+
+
+def get_json(url, call_site, params=None, session=None, **kwargs):
+    """
+    GET a ConnectWise endpoint with the call site's declared fields projection.
+
+    Args:
+        url (str): The endpoint URL.
+        call_site (str): Name of the call site in FIELD_PROJECTIONS.
+        params (dict): Query parameters of the call.
+        session (requests.Session): Session to use, defaults to the shared one.
+        **kwargs: Passed through to session.get.
+
+    Returns:
+        The decoded JSON response.
+
+    Raises:
+        requests.HTTPError: If the request fails.
+    """
+    session = session or get_session()
+    response = session.get(url, params=projected_params(call_site, params), **kwargs)
+    response.raise_for_status()
+    return track_reads(call_site, response.json())
+
+
+def report_usage():
+    """
+    Print, per call site, the response keys that were fetched but never read.
+    """
+    with _usage_lock:
+        usage = {call_site: {key: set(paths) for key, paths in entry.items()} for call_site, entry in _usage.items()}
+
+    for call_site, entry in sorted(usage.items()):
+        unused = sorted(entry["fetched"] - entry["read"])
+        print(f"[fields] {call_site}: read {len(entry['read'])} of {len(entry['fetched'])} keys")
+        print(f"[fields]   read: {','.join(sorted(entry['read']))}")
+        if unused:
+            print(f"[fields]   unused: {','.join(unused)}")
+
+
+if FIELDS_DEBUG:
+    atexit.register(report_usage)
@@ -0,0 +1,155 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from cw_batch import in_condition
+from cw_client import BASE_URL, get_session
+from cw_paging import DEFAULT_MAX_WORKERS, fetch_all_pages
+
+# Fields read from each bin's inventoryOnHand rows
+INVENTORY_FIELDS = "catalogItem/id,catalogItem/identifier,onHand,warehouse/id,warehouse/name"
+
+# Snapshot column order
+SNAPSHOT_COLUMNS = ["Warehouse ID", "Warehouse", "Bin ID", "Bin", "ID", "Name", "On Hand"]
+
+# Partition directory prefixes of the CSV and Parquet layouts
+PARTITION_PREFIXES = ("warehouse_id=", "Warehouse ID=")
+
+# Partition of rows without a warehouse, named as pyarrow names it
+MISSING_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def discover_bins(warehouse_ids=None, bin_ids=None, base_url=BASE_URL, session=None):
+    """
+    List warehouse bins, optionally limited to some warehouses or bins.
+
+    Bins named in bin_ids are returned whether or not they are active;
+    otherwise only active bins are listed. Both filters are applied by the
+    API conditions.
+
+    Args:
+        warehouse_ids (list): Only bins in these warehouses, or None for all.
+        bin_ids (list): Only these bins, or None for all active bins.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: Bin records with id, name and warehouse.
+    """
+    conditions = [in_condition("id", bin_ids) if bin_ids else "inactiveFlag=false"]
+    if warehouse_ids:
+        conditions.append(in_condition("warehouse/id", warehouse_ids))
+
+    params = {
+        "conditions": " and ".join(conditions),
+        "fields": "id,name,warehouse/id,warehouse/name"
+    }
+    return fetch_all_pages(f"{base_url}/procurement/warehouseBins", params, session=session or get_session())
+
+
+def fetch_bin_inventory(bin_record, conditions="onHand>0", base_url=BASE_URL, session=None):
+    """
+    Fetch the on-hand inventory of one bin as snapshot rows.
+
+    Args:
+        bin_record (dict): A bin from discover_bins.
+        conditions (str): Conditions for the inventoryOnHand rows, or "" for all.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: Snapshot rows (dicts keyed by SNAPSHOT_COLUMNS).
+    """
+    url = f"{base_url}/procurement/warehouseBins/{bin_record['id']}/inventoryOnHand"
+    params = {"fields": INVENTORY_FIELDS}
+    if conditions:
+        params["conditions"] = conditions
+    items = fetch_all_pages(url, params, session=session or get_session())
+
+    warehouse = bin_record.get("warehouse", {})
+    return [
+        {
+            "Warehouse ID": item.get("warehouse", {}).get("id", warehouse.get("id")),
+            "Warehouse": item.get("warehouse", {}).get("name", warehouse.get("name")),
+            "Bin ID": bin_record["id"],
+            "Bin": bin_record.get("name"),
+            "ID": item.get("catalogItem", {}).get("id"),
+            "Name": item.get("catalogItem", {}).get("identifier"),
+            "On Hand": item.get("onHand")
+        }
+        for item in items
+    ]
+
+
+def take_inventory_snapshot(warehouse_ids=None, bin_ids=None, conditions="onHand>0",
+                            max_workers=DEFAULT_MAX_WORKERS, base_url=BASE_URL, session=None):
+    """
+    Pull on-hand inventory for every matching bin concurrently.
+
+    Args:
+        warehouse_ids (list): Only bins in these warehouses, or None for all.
+        bin_ids (list): Only these bins, or None for all.
+        conditions (str): Conditions for the inventoryOnHand rows.
+        max_workers (int): Maximum number of bins pulled at once.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        pandas.DataFrame: One row per bin and catalog item, in SNAPSHOT_COLUMNS.
+    """
+    session = session or get_session()
+    bins = discover_bins(warehouse_ids, bin_ids, base_url=base_url, session=session)
+    print(f"Pulling on-hand inventory for {len(bins)} bins")
+
+    def pull(bin_record):
+        return fetch_bin_inventory(bin_record, conditions=conditions, base_url=base_url, session=session)
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for bin_rows in executor.map(pull, bins):
+            rows.extend(bin_rows)
+    return pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS)
+
+
+def clear_partitions(output_dir):
+    """
+    Remove the warehouse partitions of an earlier snapshot.
+
+    Args:
+        output_dir (str): Directory holding the partitions.
+    """
+    if not os.path.isdir(output_dir):
+        return
+    for entry in os.listdir(output_dir):
+        path = os.path.join(output_dir, entry)
+        if entry.startswith(PARTITION_PREFIXES) and os.path.isdir(path):
+            shutil.rmtree(path)
+
+
+def write_snapshot(snapshot, output_dir, file_format="csv"):
+    """
+    Write a snapshot partitioned by warehouse.
+
+    CSV output goes to one file per warehouse under warehouse_id=<id>/.
+    Parquet output uses the same layout and needs pyarrow installed. Rows
+    without a warehouse go to the __HIVE_DEFAULT_PARTITION__ partition, and
+    partitions left by an earlier snapshot are removed first.
+
+    Args:
+        snapshot (pandas.DataFrame): The snapshot from take_inventory_snapshot.
+        output_dir (str): Directory that receives the partitions.
+        file_format (str): "csv" or "parquet".
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported snapshot format: {file_format}")
+    clear_partitions(output_dir)
+
+    if file_format == "parquet":
+        snapshot.to_parquet(output_dir, partition_cols=["Warehouse ID"], index=False)
+        return
+
+    for warehouse_id, partition in snapshot.groupby("Warehouse ID", sort=True, dropna=False):
+        partition_name = MISSING_PARTITION if pd.isna(warehouse_id) else int(warehouse_id)
+        partition_dir = os.path.join(output_dir, f"warehouse_id={partition_name}")
+        os.makedirs(partition_dir, exist_ok=True)
+        partition.to_csv(os.path.join(partition_dir, "inventory_on_hand.csv"), index=False)
@@ -0,0 +1,167 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Row outcome that counts as done on a resumed run
+SUCCESS = "success"
+
+
+def parse_run_args(description, default_journal_path):
+    """
+    Parse the --resume/--fresh/--journal options shared by the long migration scripts.
+
+    Args:
+        description (str): Description shown by --help.
+        default_journal_path (str): Journal path used when --journal is not given.
+
+    Returns:
+        argparse.Namespace: The parsed options (resume, fresh, journal).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true",
+                      help="skip rows the journal already records as successful")
+    mode.add_argument("--fresh", action="store_true",
+                      help="discard an existing journal and process every row again")
+    parser.add_argument("--journal", default=default_journal_path,
+                        help="path of the write-ahead journal file")
+    return parser.parse_args()
+
+
+def journal_key(*values):
+    """
+    Build a journal key from row values, whatever dtype pandas gave their columns.
+
+    Blank values (None or NaN) become "", and whole-number floats lose their
+    ".0", so an ID of 1 keys the same as 1.0 from a column with blanks.
+
+    Args:
+        *values: The row values identifying the row.
+
+    Returns:
+        str: The values joined with "|".
+    """
+    parts = []
+    for value in values:
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            parts.append("")
+        elif isinstance(value, float) and value.is_integer():
+            parts.append(str(int(value)))
+        else:
+            parts.append(str(value).strip())
+    return "|".join(parts)
+
+
+def load_journal(path):
+    """
+    Read the last recorded outcome for every key in a journal file.
+
+    A truncated last line (from a crash mid-write) is ignored.
+
+    Args:
+        path (str): Path of the journal file.
+
+    Returns:
+        dict: Row key to its last journal entry.
+    """
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+
+    with open(path, "r", encoding="utf-8") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entries[entry["key"]] = entry
+    return entries
+
+
+class RunJournal:
+    """
+    Append-only journal of row outcomes for a resumable run.
+
+    Every outcome is flushed and fsynced before the next row starts, so a
+    crash loses at most the row in flight. An existing journal is only
+    overwritten when fresh is set, so a rerun without --resume cannot
+    forget what was already created.
+    """
+
+    def __init__(self, path, resume=False, fresh=False):
+        if not resume and not fresh and os.path.exists(path) and os.path.getsize(path) > 0:
+            sys.exit(f"Journal {path} already records a run. Pass --resume to skip the rows it "
+                     f"records as created, or --fresh to discard it and process every row again.")
+        self.path = path
+        self.entries = load_journal(path) if resume else {}
+        self.lock = threading.Lock()
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and self.file.tell() > 0:
+            # Start on a fresh line in case the last write was cut short
+            with open(path, "rb") as journal_file:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def is_done(self, key):
+        """
+        Return True if the row was recorded as successful.
+
+        Args:
+            key (str): The row key.
+
+        Returns:
+            bool: Whether the row can be skipped.
+        """
+        entry = self.entries.get(str(key))
+        return entry is not None and entry.get("status") == SUCCESS
+
+    def created_id(self, key):
+        """
+        Return the ID recorded when the row was created, if any.
+
+        Args:
+            key (str): The row key.
+
+        Returns:
+            The created ID, or None.
+        """
+        entry = self.entries.get(str(key))
+        return entry.get("created_id") if entry else None
+
+    def record(self, key, status, created_id=None, **details):
+        """
+        Durably record the outcome of a row.
+
+        Args:
+            key (str): The row key.
+            status (str): SUCCESS, or any other value for a row to retry.
+            created_id: ID of the record the row created, if any.
+            **details: Extra JSON-serializable values to keep with the entry.
+        """
+        entry = {
+            "key": str(key),
+            "status": status,
+            "created_id": created_id,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            **details
+        }
+        line = json.dumps(entry, default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.entries[entry["key"]] = entry
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,144 @@
+import re
+from collections import Counter
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # rapidfuzz is optional; difflib gives the same scale, only slower
+    fuzz = None
+    from difflib import SequenceMatcher
+
+# Length of the character n-grams used for blocking
+NGRAM_SIZE = 3
+
+# Candidates scored per name, taken from the most n-grams shared
+DEFAULT_MAX_CANDIDATES = 50
+
+# N-grams found in more than this share of names are too common to block on
+MAX_NGRAM_SHARE = 0.1
+
+# N-grams found in at most this many names are always kept, so small lists and duplicate names still block
+MIN_NGRAM_POSTINGS = DEFAULT_MAX_CANDIDATES
+
+# Words left out of the comparison, e.g. "Acme, Inc." and "ACME" match
+STOP_WORDS = {"inc", "incorporated", "llc", "ltd", "co", "corp", "corporation", "company", "the"}
+
+
+def normalize_company_name(name):
+    """
+    Normalize a company name for matching.
+
+    Case and punctuation are dropped, and so are legal suffixes such as
+    "Inc" and "LLC".
+
+    Args:
+        name (str): The company name.
+
+    Returns:
+        str: The normalized name, words sorted.
+    """
+    words = re.sub(r"[^0-9a-z]+", " ", str(name).casefold()).split()
+    kept = [word for word in words if word not in STOP_WORDS] or words
+    return " ".join(sorted(kept))
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    """
+    Return the character n-grams of a normalized name, padded at the ends.
+
+    Args:
+        text (str): The normalized name.
+        size (int): The n-gram length.
+
+    Returns:
+        set: The n-grams.
+    """
+    padded = f" {text} "
+    return {padded[start:start + size] for start in range(max(1, len(padded) - size + 1))}
+
+
+def similarity(left, right):
+    """
+    Score two normalized names from 0 to 100.
+
+    Args:
+        left (str): A normalized name.
+        right (str): A normalized name.
+
+    Returns:
+        float: The similarity score.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(left, right)
+    return SequenceMatcher(None, left, right).ratio() * 100
+
+
+class CompanyMatcher:
+    """
+    Local fuzzy matcher of names against a company list.
+
+    Companies are indexed by character n-grams. A name is only scored
+    against the companies sharing the most n-grams with it, so a lookup
+    costs a handful of comparisons rather than one per company. A name
+    whose n-grams are all too common to index is scored against every
+    company.
+    """
+
+    def __init__(self, companies, name_key="name", max_candidates=DEFAULT_MAX_CANDIDATES):
+        """
+        Args:
+            companies (list): Company records.
+            name_key (str): Key of the company name in each record.
+            max_candidates (int): Candidates scored per name.
+        """
+        self.companies = list(companies)
+        self.max_candidates = max_candidates
+        self.names = [normalize_company_name(company.get(name_key) or "") for company in self.companies]
+
+        postings = {}
+        for position, name in enumerate(self.names):
+            for gram in ngrams(name):
+                postings.setdefault(gram, []).append(position)
+        max_postings = max(MIN_NGRAM_POSTINGS, int(len(self.companies) * MAX_NGRAM_SHARE))
+        self.index = {gram: positions for gram, positions in postings.items() if len(positions) <= max_postings}
+
+    def candidates(self, name):
+        """
+        Return the positions of the companies sharing the most n-grams with a name.
+
+        Args:
+            name (str): The normalized name.
+
+        Returns:
+            list: Company positions, most shared n-grams first, or every
+                position if none of the name's n-grams are indexed.
+        """
+        grams = ngrams(name)
+        indexed = [gram for gram in grams if gram in self.index]
+        if not indexed:
+            return range(len(self.companies))
+
+        shared = Counter()
+        for gram in indexed:
+            shared.update(self.index[gram])
+        return [position for position, _ in shared.most_common(self.max_candidates)]
+
+    def match(self, name, min_score=0):
+        """
+        Find the best-matching company for a name.
+
+        Args:
+            name (str): The name to match.
+            min_score (float): Lowest score accepted as a match.
+
+        Returns:
+            tuple: (company record, score), or (None, best score) if nothing reaches min_score.
+        """
+        normalized = normalize_company_name(name)
+        best, best_score = None, 0
+        for position in self.candidates(normalized):
+            score = similarity(normalized, self.names[position])
+            if score > best_score:
+                best, best_score = self.companies[position], score
+        if best is None or best_score < min_score:
+            return None, best_score
+        return best, best_score
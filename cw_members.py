@@ -0,0 +1,122 @@
+from cw_cache import DEFAULT_TTL, load_cache, save_cache
+from cw_client import BASE_URL, get_session
+from cw_paging import fetch_all_pages
+from cw_reference import ReferenceIndex, normalize_name
+
+# Fields read from /system/members
+MEMBER_FIELDS = "id,identifier,firstName,lastName"
+
+
+def full_name(member):
+    """
+    Return "First Last" for a member record.
+
+    Args:
+        member (dict): The member record.
+
+    Returns:
+        str: The member's full name.
+    """
+    return " ".join(part for part in (member.get("firstName"), member.get("lastName")) if part)
+
+
+class MemberIndex:
+    """
+    In-memory directory of members keyed by identifier, full name and last name.
+
+    Last names are matched by prefix in id order, so a lookup returns the
+    same member as the first result of a `lastName like 'value%'` query.
+    When several members match, the lowest id wins and the query is
+    recorded in ambiguous (and printed once).
+    """
+
+    def __init__(self, members):
+        self.members = sorted(members, key=lambda member: member["id"])
+        self.by_identifier = {}
+        self.by_full_name = {}
+        for member in self.members:
+            self.by_identifier.setdefault(normalize_name(member.get("identifier", "")), []).append(member)
+            self.by_full_name.setdefault(normalize_name(full_name(member)), []).append(member)
+        self.by_last_name = ReferenceIndex(
+            [{"id": member["id"], "name": member.get("lastName") or "", "member": member} for member in self.members]
+        )
+        self.ambiguous = {}
+        self.fallbacks = {}
+        self.misses = set()
+
+    @classmethod
+    def load(cls, base_url=BASE_URL, session=None, cache_path=None, ttl=DEFAULT_TTL):
+        """
+        Build the index from one paged /system/members pull.
+
+        Args:
+            base_url (str): The base URL of the API.
+            session (requests.Session): Session to use, defaults to the shared one.
+            cache_path (str): Optional JSON file that keeps the pull between runs.
+            ttl (int): Maximum age of the cache file in seconds.
+
+        Returns:
+            MemberIndex: The index.
+        """
+        members = load_cache(cache_path, ttl)
+        if members is None:
+            members = fetch_all_pages(f"{base_url}/system/members", {"fields": MEMBER_FIELDS},
+                                      session=session or get_session())
+            if cache_path:
+                save_cache(cache_path, members)
+        return cls(members)
+
+    def candidates(self, name, last_name=None):
+        """
+        Return the members matching a name, from the most specific key down.
+
+        The identifier and full name are matched exactly; the last name
+        (defaults to name) is matched by prefix.
+
+        Args:
+            name (str): Identifier or full name, e.g. "John Smith".
+            last_name (str): Last name to fall back on.
+
+        Returns:
+            list: The matching members in id order, or [] if none match.
+        """
+        if name:
+            key = normalize_name(name).strip()
+            for index in (self.by_identifier, self.by_full_name):
+                if index.get(key):
+                    return index[key]
+        last_name = last_name or name
+        if not last_name:
+            return []
+        return [record["member"] for record in self.by_last_name.prefix_matches(str(last_name).strip())]
+
+    def resolve(self, name, last_name=None, fallback=None):
+        """
+        Resolve a member ID, falling back to another member when nothing matches.
+
+        Args:
+            name (str): Identifier or full name.
+            last_name (str): Last name to fall back on.
+            fallback (str): Name of the member used when nothing matches; resolved once.
+
+        Returns:
+            int or None: The member ID.
+        """
+        matches = self.candidates(name, last_name)
+        if len(matches) > 1:
+            query = (name, last_name)
+            if query not in self.ambiguous:
+                self.ambiguous[query] = [member["id"] for member in matches]
+                print(f"Ambiguous member for {name or last_name!r}: IDs {self.ambiguous[query]}, using {matches[0]['id']}")
+        if matches:
+            return matches[0]["id"]
+
+        query = last_name or name
+        if query and query not in self.misses:
+            self.misses.add(query)
+            print(f"No matching member found for: {query}")
+        if fallback is None:
+            return None
+        if fallback not in self.fallbacks:
+            self.fallbacks[fallback] = self.resolve(fallback)
+        return self.fallbacks[fallback]
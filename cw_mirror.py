@@ -0,0 +1,211 @@
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+import pandas as pd
+from cw_client import BASE_URL, get_session
+from cw_paging import iter_pages
+
+# Entities kept in the local mirror: list endpoint and the fields mirrored
+MIRROR_ENTITIES = {
+    "companies": ("/company/companies",
+                  "id,identifier,name,status/name,types/id,defaultContact/id,_info/lastUpdated"),
+    "opportunities": ("/sales/opportunities",
+                      "id,name,company/id,stage/id,status/id,expectedCloseDate,_info/lastUpdated"),
+    "orders": ("/sales/orders",
+               "id,orderDate,department/id,company/id,opportunity/id,status/id,total,_info/lastUpdated"),
+    "products": ("/procurement/products",
+                 "id,catalogItem/identifier,description,opportunity/id,salesOrder/id,agreement/id,_info/lastUpdated"),
+    "catalog": ("/procurement/catalog",
+                "id,identifier,description,cost,price,inactiveFlag,_info/lastUpdated"),
+}
+
+# Columns of sync_state added after the first release, created on open for older mirrors
+SYNC_STATE_COLUMNS = {"resume_id": "INTEGER", "resume_high_water": "TEXT"}
+
+# Default location of the mirror database
+DEFAULT_MIRROR_PATH = os.getenv("CW_MIRROR_PATH", "cw_mirror.sqlite")
+
+
+def open_mirror(path=DEFAULT_MIRROR_PATH):
+    """
+    Open (and create if needed) the local mirror database.
+
+    Args:
+        path (str): Path of the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: The open mirror.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS sync_state (entity TEXT PRIMARY KEY, high_water TEXT, synced_at TEXT)"
+    )
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(sync_state)")}
+    for column, column_type in SYNC_STATE_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE sync_state ADD COLUMN {column} {column_type}")
+    for entity in MIRROR_ENTITIES:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {entity} (id INTEGER PRIMARY KEY, last_updated TEXT, data TEXT)"
+        )
+    conn.commit()
+    return conn
+
+
+def normalize_timestamp(value):
+    """
+    Convert an API timestamp to UTC "YYYY-MM-DDTHH:MM:SSZ", which sorts as text.
+
+    Args:
+        value (str): The timestamp, e.g. "2025-01-02T03:04:05Z" or with an offset.
+
+    Returns:
+        str or None: The normalized timestamp, or value unchanged if it cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def get_high_water(conn, entity):
+    """
+    Return the latest lastUpdated value synced for an entity.
+
+    Args:
+        conn (sqlite3.Connection): The open mirror.
+        entity (str): A key of MIRROR_ENTITIES.
+
+    Returns:
+        str or None: The high-water mark, or None if never synced.
+    """
+    row = conn.execute("SELECT high_water FROM sync_state WHERE entity = ?", (entity,)).fetchone()
+    return normalize_timestamp(row[0]) if row else None
+
+
+def get_resume_point(conn, entity):
+    """
+    Return where an interrupted sync of an entity stopped.
+
+    Args:
+        conn (sqlite3.Connection): The open mirror.
+        entity (str): A key of MIRROR_ENTITIES.
+
+    Returns:
+        tuple: (last id stored, high-water mark of the interrupted run), or (None, None).
+    """
+    row = conn.execute("SELECT resume_id, resume_high_water FROM sync_state WHERE entity = ?",
+                       (entity,)).fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def sync_entity(conn, entity, base_url=BASE_URL, session=None, full=False):
+    """
+    Pull records changed since the entity's high-water mark into the mirror.
+
+    Only the fields in MIRROR_ENTITIES are pulled. Pages are read in id
+    order and upserted by id, committing after each page, so an interrupted
+    sync keeps what it stored and the next run picks up after the last id.
+    The high-water mark only moves once a sync completes. The lastUpdated
+    condition does not see deletions, so run with full=True now and then to
+    rebuild the table.
+
+    Args:
+        conn (sqlite3.Connection): The open mirror.
+        entity (str): A key of MIRROR_ENTITIES.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+        full (bool): Drop the local rows and pull everything again.
+
+    Returns:
+        int: The number of records pulled.
+    """
+    session = session or get_session()
+    endpoint, fields = MIRROR_ENTITIES[entity]
+    high_water = None if full else get_high_water(conn, entity)
+    resume_id, resume_high_water = (None, None) if full else get_resume_point(conn, entity)
+
+    if full:
+        conn.execute(f"DELETE FROM {entity}")
+    conn.execute("INSERT OR IGNORE INTO sync_state (entity) VALUES (?)", (entity,))
+    conn.commit()
+
+    conditions = []
+    if high_water:
+        # Inclusive so records updated in the same second are not skipped
+        conditions.append(f"lastUpdated>=[{high_water}]")
+    if resume_id is not None:
+        print(f"Resuming {entity} sync after id {resume_id}")
+        conditions.append(f"id>{resume_id}")
+    params = {"fields": fields, "orderBy": "id asc"}
+    if conditions:
+        params["conditions"] = " and ".join(conditions)
+
+    count = 0
+    run_high_water = None
+    for page in iter_pages(f"{base_url}{endpoint}", params, session=session):
+        if not page:
+            continue
+        rows = [
+            (record["id"], normalize_timestamp(record.get("_info", {}).get("lastUpdated")), json.dumps(record))
+            for record in page
+        ]
+        conn.executemany(f"INSERT OR REPLACE INTO {entity} (id, last_updated, data) VALUES (?, ?, ?)", rows)
+        count += len(rows)
+        run_high_water = max([row[1] for row in rows if row[1]] + [run_high_water or ""]) or None
+
+        # A resumed run keeps the mark of the run it continues, which predates any update it missed
+        conn.execute(
+            "UPDATE sync_state SET resume_id = ?, resume_high_water = ? WHERE entity = ?",
+            (max(row[0] for row in rows), resume_high_water if resume_id is not None else run_high_water, entity)
+        )
+        conn.commit()
+
+    candidate = resume_high_water if resume_id is not None else run_high_water
+    new_high_water = max(filter(None, [candidate, high_water]), default=None)
+    conn.execute(
+        "UPDATE sync_state SET high_water = ?, synced_at = datetime('now'), resume_id = NULL, "
+        "resume_high_water = NULL WHERE entity = ?",
+        (new_high_water, entity)
+    )
+    conn.commit()
+
+    print(f"Synced {count} {entity} records (high-water mark {new_high_water})")
+    return count
+
+
+def sync_all(conn, entities=None, base_url=BASE_URL, session=None):
+    """
+    Incrementally sync several entities.
+
+    Args:
+        conn (sqlite3.Connection): The open mirror.
+        entities (list): Keys of MIRROR_ENTITIES, defaults to all of them.
+        base_url (str): The base URL of the API.
+        session (requests.Session): Session to use, defaults to the shared one.
+    """
+    for entity in entities or MIRROR_ENTITIES:
+        sync_entity(conn, entity, base_url=base_url, session=session)
+
+
+def load_entity(conn, entity):
+    """
+    Load a mirrored entity as a flattened DataFrame.
+
+    Nested fields become dotted columns, e.g. "opportunity.id".
+
+    Args:
+        conn (sqlite3.Connection): The open mirror.
+        entity (str): A key of MIRROR_ENTITIES.
+
+    Returns:
+        pandas.DataFrame: One row per record.
+    """
+    records = [json.loads(data) for (data,) in conn.execute(f"SELECT data FROM {entity} ORDER BY id")]
+    return pd.json_normalize(records)
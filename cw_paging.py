@@ -0,0 +1,135 @@
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cw_client import get_session
+
+# ConnectWise caps pageSize at 1000
+MAX_PAGE_SIZE = 1000
+
+# Number of pages fetched at the same time
+DEFAULT_MAX_WORKERS = 8
+
+# Query parameters that apply to the /count variant of an endpoint
+COUNT_PARAMS = ("conditions", "childConditions", "customFieldConditions")
+
+
+def fetch_count(url, params=None, session=None):
+    """
+    Get the total record count for a list endpoint via its /count variant.
+
+    Args:
+        url (str): The list endpoint URL.
+        params (dict): Query parameters of the list call.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        int: The number of records matching the conditions.
+    """
+    session = session or get_session()
+    count_params = {k: v for k, v in (params or {}).items() if k in COUNT_PARAMS}
+    response = session.get(f"{url}/count", params=count_params)
+    response.raise_for_status()
+    return response.json().get("count", 0)
+
+
+def fetch_page(url, params, page, page_size, session=None):
+    """
+    Fetch a single page of a list endpoint.
+
+    Args:
+        url (str): The list endpoint URL.
+        params (dict): Query parameters of the list call.
+        page (int): The 1-based page number.
+        page_size (int): Records per page.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: The records on the page.
+    """
+    session = session or get_session()
+    page_params = dict(params or {}, page=page, pageSize=page_size)
+    response = session.get(url, params=page_params)
+    response.raise_for_status()
+    data = response.json()
+    return data if isinstance(data, list) else []
+
+
+def iter_pages(url, params=None, page_size=MAX_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+               use_count=True, session=None):
+    """
+    Yield the pages of a list endpoint in order, fetching ahead concurrently.
+
+    At most max_workers pages are in flight or waiting to be consumed, so
+    memory stays flat however large the result is. With use_count the total
+    is probed through the /count variant; without it (endpoints that have no
+    count) pages are requested until a short page is seen.
+
+    Args:
+        url (str): The list endpoint URL.
+        params (dict): Query parameters (conditions, fields, ...).
+        page_size (int): Records per page, at most 1000.
+        max_workers (int): Maximum number of pages in flight.
+        use_count (bool): Probe /count first instead of stopping on a short page.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Yields:
+        list: The records of each page, in the order the API returns them.
+
+    Raises:
+        requests.HTTPError: If any page request fails.
+    """
+    session = session or get_session()
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    params = {k: v for k, v in (params or {}).items() if k not in ("page", "pageSize")}
+    total_pages = math.ceil(fetch_count(url, params, session=session) / page_size) if use_count else None
+
+    def get_page(page):
+        return fetch_page(url, params, page, page_size, session=session)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        next_page = 1
+        while True:
+            # Keep the window of pages in flight full
+            while len(pending) < max_workers and (total_pages is None or next_page <= total_pages):
+                pending.append(executor.submit(get_page, next_page))
+                next_page += 1
+            if not pending:
+                return
+
+            data = pending.popleft().result()
+            yield data
+            if total_pages is None and len(data) < page_size:
+                for future in pending:
+                    future.cancel()
+                return
+
+
+def fetch_all_pages(url, params=None, page_size=MAX_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS,
+                    use_count=True, session=None):
+    """
+    Fetch every page of a list endpoint concurrently, in page order.
+
+    With use_count the total is probed through the /count variant and all
+    pages are fetched in parallel. Without it (endpoints that have no count)
+    pages are fetched ahead until a short page is seen.
+
+    Args:
+        url (str): The list endpoint URL.
+        params (dict): Query parameters (conditions, fields, ...).
+        page_size (int): Records per page, at most 1000.
+        max_workers (int): Maximum number of pages in flight.
+        use_count (bool): Probe /count first instead of stopping on a short page.
+        session (requests.Session): Session to use, defaults to the shared one.
+
+    Returns:
+        list: All records, in the order the API returns them.
+
+    Raises:
+        requests.HTTPError: If any page request fails.
+    """
+    records = []
+    for data in iter_pages(url, params, page_size=page_size, max_workers=max_workers,
+                           use_count=use_count, session=session):
+        records.extend(data)
+    return records
@@ -0,0 +1,116 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Starting and ceiling request rates, in requests per second
+DEFAULT_RATE = float(os.getenv("CW_RATE_LIMIT", "20"))
+DEFAULT_MAX_RATE = float(os.getenv("CW_MAX_RATE", "50"))
+
+# Floor the rate never drops below, however often the API throttles us
+MIN_RATE = 0.5
+
+# Rate added back after each successful request (additive increase)
+RATE_STEP = 0.1
+
+# Backoff base and cap for retries without a Retry-After header, in seconds
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        float or None: Seconds to wait, or None if missing or unparseable.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt (int): The 0-based retry attempt.
+        base (float): Delay of the first attempt, in seconds.
+        cap (float): Maximum delay, in seconds.
+
+    Returns:
+        float: Seconds to wait before the next attempt.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket that adapts its rate to API throttling.
+
+    The rate halves on every 429/503 and creeps back up by RATE_STEP per
+    successful request, up to max_rate. A Retry-After value pauses all
+    callers until it has passed.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, max_rate=DEFAULT_MAX_RATE, burst=None):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request may be sent.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_throttle(self, retry_after=None):
+        """
+        Slow down after a 429/503 response.
+
+        Args:
+            retry_after (float): Seconds from the Retry-After header, if any.
+        """
+        with self.lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def on_success(self):
+        """
+        Speed back up after a successful response.
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + RATE_STEP)
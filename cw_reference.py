@@ -0,0 +1,174 @@
+import os
+from bisect import bisect_left
+from cw_client import BASE_URL, get_session
+from cw_cache import DEFAULT_TTL, load_cache, save_cache
+from cw_paging import fetch_all_pages
+
+# Reference tables loaded by the resolver: endpoint and fields to project
+REFERENCE_TABLES = {
+    "subcategory": ("/procurement/subcategories", "id,name,category/name"),
+    "type": ("/procurement/types", "id,name"),
+    "manufacturer": ("/procurement/manufacturers", "id,name"),
+    "uom": ("/procurement/unitOfMeasures", "id,name"),
+    "vendor": ("/company/companies", "id,name"),
+}
+
+
+def normalize_name(name):
+    """
+    Normalize a name for matching; ConnectWise `like` is case-insensitive.
+
+    Args:
+        name (str): The name to normalize.
+
+    Returns:
+        str: The case-folded name.
+    """
+    return str(name).casefold()
+
+
+class ReferenceIndex:
+    """
+    In-memory prefix index over one reference table.
+
+    Records are kept in id order so that prefix lookups return the same
+    record as the first result of a `name like 'value%'` query.
+    """
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda record: record["id"])
+        self.sorted_names = sorted(
+            (normalize_name(record.get("name", "")), position)
+            for position, record in enumerate(self.records)
+        )
+        self.keys = [name for name, _ in self.sorted_names]
+
+    def prefix_matches(self, prefix):
+        """
+        Return every record whose name starts with prefix, in id order.
+
+        Args:
+            prefix (str): The name prefix.
+
+        Returns:
+            list: The matching records.
+        """
+        prefix = normalize_name(prefix)
+        positions = []
+        start = bisect_left(self.keys, prefix)
+        for name, position in self.sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            positions.append(position)
+        return [self.records[position] for position in sorted(positions)]
+
+    def prefix(self, prefix):
+        """
+        Return the first record a `name like 'prefix%'` query would return.
+
+        Args:
+            prefix (str): The name prefix.
+
+        Returns:
+            dict or None: The matching record.
+        """
+        matches = self.prefix_matches(prefix)
+        return matches[0] if matches else None
+
+
+class ReferenceResolver:
+    """
+    Resolve reference names to IDs from tables bulk-loaded once per run.
+
+    Each table is loaded on first use with one paged pull. When cache_dir
+    is set the raw records are also kept on disk for ttl seconds.
+    """
+
+    def __init__(self, base_url=BASE_URL, session=None, cache_dir=None, ttl=DEFAULT_TTL):
+        self.base_url = base_url
+        self.session = session or get_session()
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.indexes = {}
+        self.results = {}
+
+    def load_records(self, table):
+        endpoint, fields = REFERENCE_TABLES[table]
+        cache_path = os.path.join(self.cache_dir, f"{table}.json") if self.cache_dir else None
+
+        records = load_cache(cache_path, self.ttl)
+        if records is None:
+            records = fetch_all_pages(f"{self.base_url}{endpoint}", {"fields": fields}, session=self.session)
+            if cache_path:
+                save_cache(cache_path, records)
+        return records
+
+    def index(self, table):
+        """
+        Return the index for a reference table, loading it on first use.
+
+        Args:
+            table (str): A key of REFERENCE_TABLES.
+
+        Returns:
+            ReferenceIndex: The table index.
+        """
+        if table not in self.indexes:
+            self.indexes[table] = ReferenceIndex(self.load_records(table))
+        return self.indexes[table]
+
+    def lookup(self, table, name):
+        """
+        Lookup an ID by name prefix, matching `name like 'name%'`.
+
+        Args:
+            table (str): A key of REFERENCE_TABLES.
+            name (str): The name (prefix) to look up.
+
+        Returns:
+            int or None: The ID if found, else None.
+        """
+        if not name:
+            return None
+
+        key = (table, normalize_name(name))
+        if key not in self.results:
+            record = self.index(table).prefix(name)
+            self.results[key] = record["id"] if record else None
+        return self.results[key]
+
+    def lookup_subcategory(self, category_name, subcategory_name):
+        """
+        Lookup subcategory ID by optional category name and subcategory name.
+
+        Args:
+            category_name (str): The name of the category, or None for any.
+            subcategory_name (str): The name of the subcategory.
+
+        Returns:
+            int or None: The subcategory ID if found, else None.
+        """
+        if not subcategory_name:
+            return None
+
+        key = ("subcategory", normalize_name(category_name or ""), normalize_name(subcategory_name))
+        if key not in self.results:
+            category_prefix = normalize_name(category_name or "")
+            matches = [
+                record for record in self.index("subcategory").prefix_matches(subcategory_name)
+                if normalize_name((record.get("category") or {}).get("name", "")).startswith(category_prefix)
+            ]
+            self.results[key] = matches[0]["id"] if matches else None
+        return self.results[key]
+
+    def lookup_type(self, type_name):
+        return self.lookup("type", type_name)
+
+    def lookup_manufacturer(self, manufacturer_name):
+        return self.lookup("manufacturer", manufacturer_name)
+
+    def lookup_uom(self, uom_name):
+        return self.lookup("uom", uom_name)
+
+    def lookup_vendor(self, preferred_vendor):
+        return self.lookup("vendor", preferred_vendor)
@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+
+# Rows buffered between flushes
+DEFAULT_FLUSH_EVERY = 1000
+
+# Output formats by file extension
+FORMATS_BY_EXTENSION = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+
+
+def flatten_record(record, sep="."):
+    """
+    Flatten nested dicts the way pandas.json_normalize names its columns.
+
+    Args:
+        record (dict): The record, e.g. an API response object.
+        sep (str): Separator between nested key names.
+
+    Returns:
+        dict: The record with nested keys joined, e.g. "company.name".
+    """
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            for nested_key, nested_value in flatten_record(value, sep).items():
+                flat[f"{key}{sep}{nested_key}"] = nested_value
+        else:
+            flat[key] = value
+    return flat
+
+
+class ResultSink:
+    """
+    Write result rows to a file as they are produced.
+
+    Rows are buffered and written every flush_every rows, so memory stays
+    flat and everything written before a crash is kept on disk. The file is
+    only created once the first row arrives.
+
+    CSV columns come from fieldnames, or the keys of the first row; keys
+    outside them are dropped. Parquet needs pyarrow and keeps data only once
+    the sink is closed, so use CSV or JSONL when partial results matter.
+    """
+
+    def __init__(self, path, file_format=None, fieldnames=None, flush_every=DEFAULT_FLUSH_EVERY,
+                 flatten=False, na_rep="", append=False, encoding="utf-8"):
+        """
+        Args:
+            path (str): Output file path.
+            file_format (str): "csv", "jsonl" or "parquet"; inferred from the extension if None.
+            fieldnames (list): Column order; defaults to the keys of the first row.
+            flush_every (int): Rows buffered before they are written out.
+            flatten (bool): Flatten nested dicts into dotted columns.
+            na_rep (str): CSV text written for None values.
+            append (bool): Add to an existing CSV or JSONL file instead of replacing it.
+            encoding (str): Text encoding for CSV and JSONL.
+        """
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lower()
+            file_format = FORMATS_BY_EXTENSION.get(extension, "csv")
+        if file_format not in ("csv", "jsonl", "parquet"):
+            raise ValueError(f"Unsupported output format: {file_format}")
+
+        self.path = path
+        self.file_format = file_format
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.flush_every = max(1, flush_every)
+        self.flatten = flatten
+        self.na_rep = na_rep
+        self.append = append
+        self.encoding = encoding
+        self.count = 0
+        self.buffer = []
+        self.file = None
+        self.writer = None
+
+    def write(self, row):
+        """
+        Add one row to the output.
+
+        Args:
+            row (dict): The row.
+        """
+        if self.flatten:
+            row = flatten_record(row)
+        if self.fieldnames is None:
+            self.fieldnames = list(row)
+        self.buffer.append(row)
+        self.count += 1
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def write_rows(self, rows):
+        """
+        Add several rows to the output.
+
+        Args:
+            rows (iterable): The rows.
+        """
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        """
+        Write buffered rows and push them to disk.
+        """
+        if not self.buffer:
+            return
+        if self.file_format == "parquet":
+            self._write_parquet_batch()
+        else:
+            self._open_text()
+            if self.file_format == "csv":
+                for row in self.buffer:
+                    self.writer.writerow({key: self.na_rep if value is None else value
+                                          for key, value in row.items()})
+            else:
+                for row in self.buffer:
+                    self.file.write(json.dumps(row, default=str) + "\n")
+            self.file.flush()
+        self.buffer = []
+
+    def close(self):
+        """
+        Flush remaining rows and close the file.
+        """
+        self.flush()
+        if self.writer is not None and self.file_format == "parquet":
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.writer = None
+
+    def _open_text(self):
+        if self.file is not None:
+            return
+        self.file = open(self.path, "a" if self.append else "w", newline="" if self.file_format == "csv" else None,
+                         encoding=self.encoding)
+        if self.file_format == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction="ignore")
+            if self.file.tell() == 0:
+                self.writer.writeheader()
+
+    def _write_parquet_batch(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = {name: [row.get(name) for row in self.buffer] for name in self.fieldnames}
+        if self.writer is None:
+            table = pa.table(columns)
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.table(columns, schema=self.writer.schema)
+        self.writer.write_table(table)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()